@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+逐单元格正则与配置加载的微基准测试
+
+比较改为模块级预编译正则之前（按字符串模式逐次调用 re、逐字符过滤控制字符）和之后的
+is_date_string、clean_value_for_excel 和环境变量插值，以及配置文件首次加载与命中缓存的耗时。
+写入合计缓存值一项对比的是同一功能的两种写法（每个合计单元格扫描一次 XML 与一次扫描填写全部），
+两者都是新增缓存值功能时的实现，并不是旧版本的性能。
+
+使用方法:
+    python benchmarks/bench_hot_paths.py --cells 200000 --entries 500
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+
+from bench_utils import ROOT, load_exporter
+sys.path.insert(0, ROOT)
+
+from utils import config_utils
+from utils.excel_utils import fill_cached_values
+
+
+# 预编译之前的实现，作为对照
+def legacy_is_date_string(value):
+    if not isinstance(value, str):
+        return False
+    date_pattern = r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}'
+    return bool(re.match(date_pattern, value))
+
+
+def legacy_clean_string(value):
+    value = ''.join(char for char in value if ord(char) >= 32 or char in '\n\r\t')
+    return value.replace('\x00', '').replace('\x01', '').replace('\x02', '')
+
+
+def legacy_interpolate_env_vars(config):
+    if isinstance(config, dict):
+        return {key: legacy_interpolate_env_vars(value) for key, value in config.items()}
+    elif isinstance(config, list):
+        return [legacy_interpolate_env_vars(item) for item in config]
+    elif isinstance(config, str):
+        pattern = r'\$\{([^}]+)\}'
+        return re.sub(pattern, lambda match: os.environ.get(match.group(1), ''), config)
+    return config
+
+
+# 写入合计缓存值的逐单元格写法（每个坐标编译一次正则并扫描一次 XML），作为单次扫描的对照
+def per_cell_fill_cached_values(xml, values):
+    for coordinate, value in values.items():
+        pattern = re.compile(rb'(<c r="' + coordinate.encode('ascii') + rb'"[^>]*><f>[^<]*</f>)<v(?:\s*/>|></v>)')
+        xml = pattern.sub(lambda m: m.group(1) + b'<v>' + str(value).encode('ascii') + b'</v>', xml, count=1)
+    return xml
+
+
+def generate_cells(cell_count):
+    """生成单元格样例：日期、普通文本、长文本和少量含控制字符的文本"""
+    rng = random.Random(0)
+    cells = []
+    for index in range(cell_count):
+        kind = index % 4
+        if kind == 0:
+            cells.append('2025-01-20T00:00:00+08:00')
+        elif kind == 1:
+            cells.append(f"客户{rng.randint(0, 10000)}")
+        elif kind == 2:
+            cells.append('说明文字' * rng.randint(5, 50))
+        else:
+            cells.append('含控制\x01字符\x0b的文本' if rng.random() < 0.1 else '普通文本')
+    return cells
+
+
+def generate_config(entry_count):
+    return {
+        'seatable_config': {'server_url': '${SEATABLE_SERVER_URL}', 'api_token': '${SEATABLE_API_TOKEN}'},
+        'excel_directories': {'output_dir': '/data/${REPORT_ENV}/output'},
+        'entries': [
+            {
+                'table_name': f"表格{index}",
+                'view_name': f"视图{index}",
+                'excel_directory': 'output_dir',
+                'excel_file_name': f"报表{index}.xlsx",
+                'sum_columns': ['金额', '数量', '税额'],
+                'field_mapping': {f"字段{column}": f"列{column}" for column in range(30)},
+            }
+            for index in range(entry_count)
+        ],
+    }
+
+
+def generate_sheet_xml(row_count, sum_columns):
+    rows = [f'<row r="{index}"><c r="A{index}" t="inlineStr"><is><t>x</t></is></c>'
+            f'<c r="B{index}"><v>{index}</v></c></row>' for index in range(1, row_count)]
+    total_cells = ''.join(f'<c r="{column}{row_count}" s="3"><f>SUBTOTAL(109,{column}2:{column}{row_count - 1})</f><v /></c>'
+                          for column in sum_columns)
+    xml = f'<sheetData>{"".join(rows)}<row r="{row_count}">{total_cells}</row></sheetData>'
+    return xml.encode('utf-8'), {f"{column}{row_count}": 12345.67 for column in sum_columns}
+
+
+def bench(label, func, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<40} {best * 1000:9.1f} ms")
+    return best
+
+
+def compare(label, legacy, current, repeat, legacy_label='预编译前', current_label='当前'):
+    legacy_time = bench(f"{label}（{legacy_label}）", legacy, repeat)
+    current_time = bench(f"{label}（{current_label}）", current, repeat)
+    print(f"{'':<40} {legacy_time / current_time:8.1f}x\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='逐单元格正则与配置加载的微基准测试')
+    parser.add_argument('--cells', type=int, default=200000, help='单元格样例数量')
+    parser.add_argument('--entries', type=int, default=500, help='生成配置的条目数量')
+    parser.add_argument('--rows', type=int, default=200000, help='合计缓存值测试的工作表行数')
+    parser.add_argument('--repeat', type=int, default=5, help='重复次数（取最快一次）')
+    args = parser.parse_args()
+
+    exporter = load_exporter()
+    cells = generate_cells(args.cells)
+    print(f"{len(cells)} 个单元格，配置 {args.entries} 个条目\n")
+
+    compare('is_date_string',
+            lambda: [legacy_is_date_string(value) for value in cells],
+            lambda: [exporter.is_date_string(value) for value in cells], args.repeat)
+    compare('清理控制字符',
+            lambda: [legacy_clean_string(value) for value in cells],
+            lambda: [exporter.clean_value_for_excel(value) for value in cells], args.repeat)
+
+    sheet_xml, cached_values = generate_sheet_xml(args.rows, ['C', 'D', 'E', 'F', 'G', 'H'])
+    assert per_cell_fill_cached_values(sheet_xml, cached_values) == fill_cached_values(sheet_xml, cached_values)
+    compare(f"写入合计缓存值（{len(cached_values)} 列）",
+            lambda: per_cell_fill_cached_values(sheet_xml, cached_values),
+            lambda: fill_cached_values(sheet_xml, cached_values), args.repeat,
+            legacy_label='逐单元格扫描', current_label='单次扫描')
+
+    config = generate_config(args.entries)
+    compare('环境变量插值',
+            lambda: legacy_interpolate_env_vars(config),
+            lambda: config_utils.interpolate_env_vars(config), args.repeat)
+
+    with tempfile.TemporaryDirectory() as directory:
+        config_path = os.path.join(directory, 'config.json')
+        with open(config_path, 'w', encoding='utf-8') as f:
+            json.dump(config, f, ensure_ascii=False)
+
+        def load_uncached():
+            config_utils.clear_config_cache()
+            config_utils.load_and_interpolate_config(config_path)
+
+        compare('加载配置文件', load_uncached,
+                lambda: config_utils.load_and_interpolate_config(config_path), args.repeat,
+                legacy_label='无缓存', current_label='缓存命中')
+
+
+if __name__ == '__main__':
+    main()
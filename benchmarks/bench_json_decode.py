@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+list_rows 响应解码基准测试
+
+比较标准库 json、orjson、msgspec 解码为行字典，以及按字段投影直接解码为元组的吞吐量。
+
+使用方法:
+    # 使用录制的 list_rows 响应（JSON 文件，格式为 {"rows": [...]}）
+    python benchmarks/bench_json_decode.py payload1.json payload2.json --fields 名称 金额
+
+    # 不提供文件时生成宽表样例数据
+    python benchmarks/bench_json_decode.py --rows 20000 --columns 60 --projected 8
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import seatable_api_helper
+from utils.column_utils import project_rows
+
+
+def generate_payload(row_count, column_count):
+    """生成宽表样例：文本、数字、日期、长文本和列表列混合"""
+    rng = random.Random(0)
+    rows = []
+    for index in range(row_count):
+        row = {'_id': f"row{index:08d}", '_mtime': '2025-01-20T00:00:00+08:00', '_ctime': '2025-01-01T00:00:00+08:00'}
+        for column in range(column_count):
+            kind = column % 5
+            name = f"列{column}"
+            if kind == 0:
+                row[name] = f"文本{rng.randint(0, 1000)}"
+            elif kind == 1:
+                row[name] = round(rng.uniform(0, 100000), 2)
+            elif kind == 2:
+                row[name] = '2025-01-20T00:00:00+08:00'
+            elif kind == 3:
+                row[name] = '备注' * rng.randint(10, 200)
+            else:
+                row[name] = [{'name': 'a.pdf', 'url': 'https://example.com/a.pdf', 'size': 1024}]
+        rows.append(row)
+    return json.dumps({'rows': rows}, ensure_ascii=False).encode('utf-8')
+
+
+def bench(label, func, payloads, repeat):
+    total_bytes = sum(len(payload) for payload in payloads)
+    best = None
+    row_count = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        row_count = sum(len(func(payload)) for payload in payloads)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<34} {best * 1000:9.1f} ms  {total_bytes / best / 1024 / 1024:8.1f} MB/s  "
+          f"{row_count / best:12.0f} rows/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='list_rows 响应解码基准测试')
+    parser.add_argument('payloads', nargs='*', help='录制的 list_rows 响应文件')
+    parser.add_argument('--rows', type=int, default=10000, help='生成样例的行数')
+    parser.add_argument('--columns', type=int, default=60, help='生成样例的列数')
+    parser.add_argument('--projected', type=int, default=8, help='投影解码保留的列数（未指定 --fields 时）')
+    parser.add_argument('--fields', nargs='+', help='投影解码保留的字段')
+    parser.add_argument('--repeat', type=int, default=5, help='重复次数（取最快一次）')
+    args = parser.parse_args()
+
+    if args.payloads:
+        payloads = []
+        for path in args.payloads:
+            with open(path, 'rb') as f:
+                payloads.append(f.read())
+    else:
+        payloads = [generate_payload(args.rows, args.columns)]
+
+    first_rows = json.loads(payloads[0]).get('rows') or [{}]
+    fields = args.fields or [key for key in first_rows[0] if not key.startswith('_')][:args.projected]
+    projected_fields = ['_id'] + fields
+    print(f"{len(payloads)} 个响应，共 {sum(map(len, payloads)) / 1024 / 1024:.1f} MB，投影 {len(fields)} 个字段\n")
+
+    bench('json -> dict', lambda payload: json.loads(payload)['rows'], payloads, args.repeat)
+    bench('json -> dict -> tuple', lambda payload: project_rows(json.loads(payload)['rows'], projected_fields),
+          payloads, args.repeat)
+
+    orjson = seatable_api_helper.orjson
+    msgspec = seatable_api_helper.msgspec
+    if orjson is not None:
+        bench('orjson -> dict', lambda payload: orjson.loads(payload)['rows'], payloads, args.repeat)
+    else:
+        print('orjson 未安装，跳过')
+    if msgspec is not None:
+        bench('msgspec -> dict', lambda payload: msgspec.json.decode(payload)['rows'], payloads, args.repeat)
+        bench('msgspec -> projected tuple', seatable_api_helper.make_projected_rows_decoder(projected_fields),
+              payloads, args.repeat)
+    else:
+        print('msgspec 未安装，跳过')
+
+    # 没有 msgspec 时的投影解码路径（最快的字典解码 + 投影）
+    seatable_api_helper.msgspec = None
+    bench('fallback -> projected tuple', seatable_api_helper.make_projected_rows_decoder(projected_fields),
+          payloads, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
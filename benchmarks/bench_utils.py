@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+"""基准测试与压测脚本共用的辅助函数"""
+
+import os
+import importlib.util
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_exporter():
+    """main-pro.py 的文件名不能直接 import，按路径加载"""
+    spec = importlib.util.spec_from_file_location('main_pro', os.path.join(ROOT, 'main-pro.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+XLSX 压缩级别基准测试
+
+对同一个工作簿分别使用 store / fast / default / max 保存，比较文件大小和保存耗时；
+同时比较文本列是否按列去重重复字符串时，生成工作表期间的内存占用。
+
+使用方法:
+    # 生成样例数据（含高重复率的单选列、创建者列）
+    python benchmarks/bench_xlsx_compression.py --rows 100000
+
+    # 使用已有的报表文件（只比较压缩级别）
+    python benchmarks/bench_xlsx_compression.py --input 报表@20250101.xlsx
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openpyxl import Workbook, load_workbook
+from utils.excel_utils import save_workbook, COMPRESSION_LEVELS
+from utils.column_utils import build_string_pools, ColumnFormat, KIND_TEXT, KIND_NUMBER, KIND_DATE
+
+HEADERS = ['状态', '部门', '创建者', '编号', '金额', '日期', '备注']
+COLUMN_FORMATS = [
+    ColumnFormat(KIND_TEXT, None), ColumnFormat(KIND_TEXT, None), ColumnFormat(KIND_TEXT, None),
+    ColumnFormat(KIND_TEXT, None), ColumnFormat(KIND_NUMBER, None), ColumnFormat(KIND_DATE, None),
+    ColumnFormat(KIND_TEXT, None),
+]
+
+
+def generate_rows(row_count):
+    """生成样例行：每个值都是独立的 str 对象，与解码 JSON 响应得到的结果一致"""
+    rng = random.Random(0)
+    statuses = ['待审核', '已通过', '已驳回', '已归档']
+    departments = [f"事业部{index}" for index in range(12)]
+    creators = [f"user{index}@example.com" for index in range(40)]
+    rows = []
+    for index in range(row_count):
+        rows.append((
+            ''.join(list(rng.choice(statuses))),
+            ''.join(list(rng.choice(departments))),
+            ''.join(list(rng.choice(creators))),
+            f"NO{index:08d}",
+            round(rng.uniform(0, 100000), 2),
+            f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            '备注' * rng.randint(0, 20),
+        ))
+    return rows
+
+
+def build_workbook(rows, use_pools):
+    wb = Workbook()
+    ws = wb.active
+    ws.append(HEADERS)
+    string_pools = build_string_pools(COLUMN_FORMATS) if use_pools else [None] * len(HEADERS)
+    for row in rows:
+        ws.append([pool(value) if pool is not None else value for pool, value in zip(string_pools, row)])
+    return wb
+
+
+def measure_build_memory(row_count, use_pools):
+    """返回 (工作表保留的内存, 生成期间的内存峰值)，单位 MB"""
+    tracemalloc.start()
+    rows = generate_rows(row_count)
+    wb = build_workbook(rows, use_pools)
+    del rows
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del wb
+    return current / 1024 / 1024, peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description='XLSX 压缩级别基准测试')
+    parser.add_argument('--input', help='使用已有的 xlsx 文件')
+    parser.add_argument('--rows', type=int, default=50000, help='生成样例的行数')
+    parser.add_argument('--repeat', type=int, default=3, help='重复次数（取最快一次）')
+    parser.add_argument('--skip-memory', action='store_true', help='不比较字符串去重的内存占用')
+    args = parser.parse_args()
+
+    if args.input:
+        wb = load_workbook(args.input)
+        print(f"输入文件 '{args.input}'，{sum(ws.max_row for ws in wb.worksheets)} 行\n")
+    else:
+        wb = build_workbook(generate_rows(args.rows), use_pools=True)
+        print(f"样例数据 {args.rows} 行 x {len(HEADERS)} 列\n")
+
+    with tempfile.TemporaryDirectory() as directory:
+        baseline_size = None
+        print(f"{'压缩级别':<10} {'保存耗时':>10} {'文件大小':>12} {'相对 store':>10}")
+        for compression in COMPRESSION_LEVELS:
+            file_path = os.path.join(directory, f"{compression}.xlsx")
+            best = None
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                save_workbook(wb, file_path, compression=compression)
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            size = os.path.getsize(file_path)
+            baseline_size = baseline_size or size
+            print(f"{compression:<14} {best * 1000:9.0f} ms {size / 1024 / 1024:9.2f} MB {size / baseline_size:10.1%}")
+
+    if not args.input and not args.skip_memory:
+        print("\n生成工作表的内存占用（tracemalloc）:")
+        for use_pools in (False, True):
+            current, peak = measure_build_memory(args.rows, use_pools)
+            label = '按列去重字符串' if use_pools else '不去重'
+            print(f"  {label:<12} 保留 {current:8.1f} MB  峰值 {peak:8.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
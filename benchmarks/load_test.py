@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+端到端压测：使用本地模拟 SeaTable 服务器驱动 create_excel_file
+
+模拟服务器在独立进程中运行（避免与客户端争用 GIL），客户端走完整的 seatable_api.Base 认证、
+分页并行获取、重试、列信息缓存、写入和保存流程。按不同的行数和条目数组合各运行一次，输出耗时、
+吞吐量以及服务器端统计的请求数、限流次数和传输量。
+
+每次运行后校验结果：服务器发送的行数（rows_sent）等于 行数 × 条目数，每个文件的数据行数等于条目行数，
+合计行的缓存值等于按模拟数据计算的合计；有不一致时输出原因，全部运行结束后以退出码 1 结束。
+
+使用方法:
+    python benchmarks/load_test.py --rows 1000 10000 100000 --jobs 1 4
+    # 注入延迟和限流，检验退避重试和自适应并发
+    python benchmarks/load_test.py --rows 50000 --jobs 4 --workers 4 --latency 30 --max-concurrency 6
+"""
+
+import os
+import sys
+import time
+from decimal import Decimal
+import argparse
+import tempfile
+import contextlib
+import multiprocessing
+
+import requests
+from openpyxl import load_workbook
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCHMARK_DIR)
+
+from bench_utils import ROOT, load_exporter
+sys.path.insert(0, ROOT)
+
+import mock_seatable_server
+from utils.batch_runner import run_batch
+from utils.column_utils import clear_column_metadata_cache
+
+
+def serve(url_queue, options):
+    """模拟服务器进程入口"""
+    server = mock_seatable_server.create_server(**options)
+    url_queue.put(f"http://127.0.0.1:{server.server_address[1]}")
+    server.serve_forever()
+
+
+def start_server_process(options):
+    context = multiprocessing.get_context('spawn')
+    url_queue = context.Queue()
+    process = context.Process(target=serve, args=(url_queue, options), daemon=True)
+    process.start()
+    return process, url_queue.get(timeout=30)
+
+
+SUM_COLUMNS = ['金额', '数量']
+
+
+def expected_totals(row_count):
+    """按模拟服务器的数据生成规则计算各合计列的合计"""
+    totals = {column: Decimal(0) for column in SUM_COLUMNS}
+    for index in range(row_count):
+        row = mock_seatable_server.generate_row(index, 0)
+        for column in SUM_COLUMNS:
+            totals[column] += Decimal(str(row[column]))
+    return totals
+
+
+def verify_file(file_path, row_count, totals):
+    """校验一个输出文件的数据行数和合计缓存值，返回问题列表"""
+    wb = load_workbook(filename=file_path, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = next(rows)
+        data_rows = 0
+        last_row = None
+        for row in rows:
+            if last_row is not None:
+                data_rows += 1
+            last_row = row
+    finally:
+        wb.close()
+
+    name = os.path.basename(file_path)
+    problems = []
+    if data_rows != row_count:
+        problems.append(f"{name}: 数据行数 {data_rows}，应为 {row_count}")
+    for column, expected in totals.items():
+        value = last_row[header.index(column)] if last_row and column in header else None
+        if value is None:
+            problems.append(f"{name}: '{column}' 合计没有缓存值")
+        elif abs(Decimal(str(value)) - expected) > Decimal('0.005'):
+            problems.append(f"{name}: '{column}' 合计 {value}，应为 {expected}")
+    return problems
+
+
+def verify_run(output_directory, row_count, job_count, stats, totals):
+    """校验一次运行：服务器发送的行数、文件数和每个文件的内容"""
+    problems = []
+    if stats['rows_sent'] != row_count * job_count:
+        problems.append(f"服务器发送 {stats['rows_sent']} 行，应为 {row_count * job_count} 行")
+    file_names = sorted(name for name in os.listdir(output_directory) if name.endswith('.xlsx'))
+    # 没有数据的视图不生成文件
+    expected_files = job_count if row_count else 0
+    if len(file_names) != expected_files:
+        problems.append(f"生成 {len(file_names)} 个文件，应为 {expected_files} 个")
+    for file_name in file_names:
+        problems.extend(verify_file(os.path.join(output_directory, file_name), row_count, totals))
+    return problems
+
+
+def build_entries(row_count, job_count, output_directory, page_size):
+    """每个条目读取一个独立的表格（"名称:行数" 让模拟服务器生成对应行数）"""
+    return [
+        {
+            'table_name': f"压测表{index}:{row_count}",
+            'view_name': '默认视图',
+            'excel_directory': output_directory,
+            'excel_file_name': f"压测{index}.xlsx",
+            'sum_columns': SUM_COLUMNS,
+            'page_size': page_size,
+            'skip_unchanged': False,
+            'isolate': False,
+        }
+        for index in range(job_count)
+    ]
+
+
+def run_once(exporter, server_url, row_count, job_count, workers, page_size, verbose, totals):
+    requests.post(f"{server_url}/_mock/reset")
+    clear_column_metadata_cache()
+    seatable_config = {'server_url': server_url, 'api_token': 'load-test'}
+
+    with tempfile.TemporaryDirectory() as output_directory:
+        entries = build_entries(row_count, job_count, output_directory, page_size)
+        output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(open(os.devnull, 'w'))
+        started = time.perf_counter()
+        with output:
+            if workers <= 1:
+                exporter.create_excel_file(entries, seatable_config)
+            else:
+                jobs = [('load-test', seatable_config, entry['excel_file_name'], [entry]) for entry in entries]
+                run_batch(jobs, exporter.connect_base, exporter.export_workbook,
+                          max_workers=workers, per_server_limit=workers)
+        elapsed = time.perf_counter() - started
+        created = len([name for name in os.listdir(output_directory) if name.endswith('.xlsx')])
+        stats = requests.get(f"{server_url}/_mock/stats").json()
+        problems = verify_run(output_directory, row_count, job_count, stats, totals)
+
+    return elapsed, created, stats, problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description='端到端压测（本地模拟 SeaTable 服务器）')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 50000], help='每个条目的行数，可多个')
+    parser.add_argument('--jobs', type=int, nargs='+', default=[1, 4], help='条目数，可多个')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='1 表示按交互菜单的方式顺序执行 create_excel_file，大于 1 时按批量模式并发执行')
+    parser.add_argument('--page-size', type=int, default=1000, help='客户端分页大小（默认 1000）')
+    parser.add_argument('--verbose', action='store_true', help='显示导出过程的输出')
+    mock_seatable_server.add_server_arguments(parser)
+    args = parser.parse_args()
+
+    exporter = load_exporter()
+    server_process, server_url = start_server_process(mock_seatable_server.server_options(args))
+    print(f"模拟服务器: {server_url}（独立进程）\n")
+    print(f"{'行数':>8} {'条目':>4} {'线程':>4} {'耗时':>9} {'行/秒':>10} {'文件':>4} "
+          f"{'请求':>6} {'429':>5} {'5xx':>5} {'最大并发':>6} {'传输':>9} {'校验':>4}")
+    failures = []
+    try:
+        for row_count in args.rows:
+            totals = expected_totals(row_count)
+            for job_count in args.jobs:
+                elapsed, created, stats, problems = run_once(exporter, server_url, row_count, job_count,
+                                                             args.workers, args.page_size, args.verbose, totals)
+                total_rows = row_count * job_count
+                print(f"{row_count:>10} {job_count:>6} {args.workers:>6} {elapsed:8.2f}s {total_rows / elapsed:12.0f} "
+                      f"{created:>6} {stats['requests']:>8} {stats['throttled']:>5} {stats['errors']:>5} "
+                      f"{stats['max_in_flight']:>10} {stats['bytes_sent'] / 1024 / 1024:7.1f}MB "
+                      f"{'失败' if problems else '通过':>4}")
+                failures.extend(f"[{row_count} 行 × {job_count} 条目] {problem}" for problem in problems)
+    finally:
+        server_process.terminate()
+
+    if failures:
+        print("\n校验失败:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
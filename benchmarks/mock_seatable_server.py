@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地模拟 SeaTable 服务器
+
+实现 seatable_api.Base 的 auth、list_rows、list_columns、query 使用的接口，数据按行号即时生成，
+用于在不访问真实服务器的情况下测试分页、并发、重试和缓存，以及对整个客户端链路做压测。
+
+支持的接口:
+    GET  /api/v2.1/dtable/app-access-token/                      Base.auth
+    GET  /dtable-server/api/v1/dtables/<uuid>/rows/               list_rows
+    GET  /dtable-server/api/v1/dtables/<uuid>/columns/            list_columns
+    POST /dtable-db/api/v1/query/<uuid>/                          query
+    GET  /api-gateway/api/v2/dtables/<uuid>/rows/                 list_rows（--api-gateway）
+    GET  /api-gateway/api/v2/dtables/<uuid>/columns/              list_columns（--api-gateway）
+    POST /api-gateway/api/v2/dtables/<uuid>/sql                   query（--api-gateway）
+    GET  /_mock/stats    POST /_mock/reset                        请求统计
+
+表格名称可以写成 "名称:行数"（如 "销售:200000"）指定行数，其他表格使用 --rows 的行数。
+
+使用方法:
+    python benchmarks/mock_seatable_server.py --port 8800 --rows 50000 --latency 20 --throttle-rate 0.05
+    # 配置文件中使用 "server_url": "http://127.0.0.1:8800"，api_token 任意（或与 --api-token 一致）
+"""
+
+import re
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from collections import OrderedDict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+DTABLE_UUID = 'mock0000000000000000000000000000'
+ACCESS_TOKEN = 'mock-access-token'
+PAGE_CACHE_SIZE = 256
+
+STATUS_OPTIONS = [{'id': f"opt{index}", 'name': name, 'color': '#aaa'}
+                  for index, name in enumerate(['待审核', '已通过', '已驳回', '已归档'])]
+STATUS_NAMES = [option['name'] for option in STATUS_OPTIONS]
+
+# 固定列：覆盖导出时按类型处理的各类列
+BASE_COLUMNS = [
+    {'key': '0000', 'name': '名称', 'type': 'text', 'data': None},
+    {'key': 'aaaa', 'name': '金额', 'type': 'number',
+     'data': {'format': 'yuan', 'precision': 2, 'enable_precision': True}},
+    {'key': 'bbbb', 'name': '数量', 'type': 'number',
+     'data': {'format': 'number', 'precision': 0, 'enable_precision': True}},
+    {'key': 'cccc', 'name': '比例', 'type': 'number',
+     'data': {'format': 'percent', 'precision': 2, 'enable_precision': True}},
+    {'key': 'dddd', 'name': '日期', 'type': 'date', 'data': {'format': 'YYYY-MM-DD'}},
+    {'key': 'eeee', 'name': '状态', 'type': 'single-select', 'data': {'options': STATUS_OPTIONS}},
+    {'key': 'ffff', 'name': '备注', 'type': 'long-text', 'data': None},
+    {'key': 'gggg', 'name': '附件', 'type': 'file', 'data': None},
+    {'key': 'hhhh', 'name': '创建者', 'type': 'creator', 'data': None},
+]
+
+
+def build_columns(extra_columns):
+    columns = [dict(column) for column in BASE_COLUMNS]
+    for index in range(extra_columns):
+        columns.append({'key': f"x{index:03d}", 'name': f"字段{index}", 'type': 'text', 'data': None})
+    return columns
+
+
+def generate_row(index, extra_columns):
+    """按行号生成一行数据（同一行号每次生成的结果相同）"""
+    row = {
+        '_id': f"row{index:012d}",
+        '_ctime': '2025-01-01T00:00:00.000+00:00',
+        '_mtime': '2025-01-20T00:00:00.000+00:00',
+        '名称': f"项目{index}",
+        '金额': round((index * 7919 % 10000000) / 100, 2),
+        '数量': index % 500,
+        '比例': (index % 100) / 100,
+        '日期': f"2025-{index % 12 + 1:02d}-{index % 28 + 1:02d}T00:00:00+08:00",
+        '状态': STATUS_NAMES[index % len(STATUS_NAMES)],
+        '备注': '说明文字' * (index % 40),
+        '附件': [{'name': f"附件{index}.pdf", 'url': f"https://files.example.com/{index}.pdf",
+                'size': 1024 + index % 4096, 'type': 'file'}] if index % 3 == 0 else [],
+        '创建者': f"user{index % 20}@auth.local",
+    }
+    for column in range(extra_columns):
+        row[f"字段{column}"] = f"值{(index + column) % 1000}"
+    return row
+
+
+class MockState:
+    """服务器配置、生成数据的缓存和请求统计（所有请求线程共享）"""
+
+    def __init__(self, default_rows=10000, tables=None, extra_columns=0, max_page_size=None,
+                 latency_ms=0, jitter_ms=0, error_rate=0.0, throttle_rate=0.0, max_concurrency=None,
+                 retry_after=1.0, api_gateway=False, api_token=None, seed=None):
+        self.default_rows = default_rows
+        self.tables = dict(tables or {})
+        self.extra_columns = extra_columns
+        self.columns = build_columns(extra_columns)
+        self.max_page_size = max_page_size
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.max_concurrency = max_concurrency
+        self.retry_after = retry_after
+        self.api_gateway = api_gateway
+        self.api_token = api_token
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.page_cache = OrderedDict()
+        self.in_flight = 0
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self.lock:
+            self.stats = {
+                'requests': 0, 'auth': 0, 'rows': 0, 'columns': 0, 'query': 0,
+                'throttled': 0, 'errors': 0, 'rows_sent': 0, 'bytes_sent': 0, 'max_in_flight': 0,
+            }
+
+    def count(self, key, amount=1):
+        with self.lock:
+            self.stats[key] += amount
+
+    def table_rows(self, table_name):
+        """表格的行数："名称:行数" 形式的表名直接指定行数"""
+        if table_name in self.tables:
+            return self.tables[table_name]
+        match = re.match(r'^.*:(\d+)$', table_name)
+        if match:
+            return int(match.group(1))
+        return self.default_rows
+
+    def rows_page(self, table_name, start, limit):
+        """返回一页 list_rows 响应 (JSON 字节, 行数)，生成结果按页缓存"""
+        total = self.table_rows(table_name)
+        end = min(total, start + limit)
+        cache_key = (table_name, start, end)
+        with self.lock:
+            cached = self.page_cache.get(cache_key)
+            if cached is not None:
+                self.page_cache.move_to_end(cache_key)
+                return cached
+        rows = [generate_row(index, self.extra_columns) for index in range(start, end)]
+        page = (json.dumps({'rows': rows}, ensure_ascii=False).encode('utf-8'), len(rows))
+        with self.lock:
+            self.page_cache[cache_key] = page
+            if len(self.page_cache) > PAGE_CACHE_SIZE:
+                self.page_cache.popitem(last=False)
+        return page
+
+
+class MockSeaTableHandler(BaseHTTPRequestHandler):
+    server_version = 'MockSeaTable/1.0'
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def state(self):
+        return self.server.state
+
+    def send_json(self, status, payload, headers=None):
+        body = payload if isinstance(payload, bytes) else json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        self.state.count('bytes_sent', len(body))
+
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def authorized(self, token):
+        return self.headers.get('Authorization') == f"Token {token}"
+
+    def inject_failure(self):
+        """按配置注入延迟、限流和服务器错误，返回 True 表示已经发送了错误响应"""
+        state = self.state
+        if state.latency_ms or state.jitter_ms:
+            time.sleep((state.latency_ms + state.random.uniform(0, state.jitter_ms)) / 1000)
+        overloaded = state.max_concurrency is not None and state.in_flight > state.max_concurrency
+        if overloaded or state.random.random() < state.throttle_rate:
+            state.count('throttled')
+            self.send_json(429, {'error_msg': 'Too many requests'}, {'Retry-After': str(state.retry_after)})
+            return True
+        if state.random.random() < state.error_rate:
+            state.count('errors')
+            self.send_json(502, {'error_msg': 'Bad gateway (injected)'})
+            return True
+        return False
+
+    def handle_request(self, method):
+        state = self.state
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        with state.lock:
+            state.in_flight += 1
+            state.stats['requests'] += 1
+            state.stats['max_in_flight'] = max(state.stats['max_in_flight'], state.in_flight)
+        try:
+            self.route(method, url.path, params)
+        finally:
+            with state.lock:
+                state.in_flight -= 1
+
+    def route(self, method, path, params):
+        state = self.state
+        if path == '/_mock/stats':
+            with state.lock:
+                stats = dict(state.stats)
+            return self.send_json(200, stats)
+        if path == '/_mock/reset' and method == 'POST':
+            state.reset_stats()
+            return self.send_json(200, {'success': True})
+
+        if path == '/api/v2.1/dtable/app-access-token/':
+            state.count('auth')
+            if state.api_token and not self.authorized(state.api_token):
+                return self.send_json(403, {'error_msg': 'Permission denied.'})
+            if self.inject_failure():
+                return
+            base_url = self.base_url()
+            return self.send_json(200, {
+                'app_name': 'mock', 'access_token': ACCESS_TOKEN, 'dtable_uuid': DTABLE_UUID,
+                'dtable_server': f"{base_url}/dtable-server/", 'dtable_socket': f"{base_url}/",
+                'dtable_db': f"{base_url}/dtable-db/", 'workspace_id': 1, 'dtable_name': 'mock',
+                'use_api_gateway': state.api_gateway,
+            })
+
+        if not self.authorized(ACCESS_TOKEN):
+            return self.send_json(401, {'error_msg': 'Token expired.'})
+
+        prefix = '/api-gateway/api/v2/dtables/' if state.api_gateway else '/dtable-server/api/v1/dtables/'
+        if path == f"{prefix}{DTABLE_UUID}/rows/" and method == 'GET':
+            return self.list_rows(params)
+        if path == f"{prefix}{DTABLE_UUID}/columns/" and method == 'GET':
+            return self.list_columns(params)
+        query_path = (f"/api-gateway/api/v2/dtables/{DTABLE_UUID}/sql" if state.api_gateway
+                      else f"/dtable-db/api/v1/query/{DTABLE_UUID}/")
+        if path == query_path and method == 'POST':
+            return self.query()
+        return self.send_json(404, {'error_msg': f"Not found: {method} {path}"})
+
+    def list_rows(self, params):
+        state = self.state
+        state.count('rows')
+        if not params.get('table_name'):
+            return self.send_json(400, {'error_msg': 'table_name invalid.'})
+        if self.inject_failure():
+            return
+        start = int(params.get('start', 0))
+        limit = int(params.get('limit', 1000))
+        if state.max_page_size:
+            limit = min(limit, state.max_page_size)
+        body, row_count = state.rows_page(params['table_name'], start, limit)
+        state.count('rows_sent', row_count)
+        return self.send_json(200, body)
+
+    def list_columns(self, params):
+        self.state.count('columns')
+        if self.inject_failure():
+            return
+        return self.send_json(200, {'columns': self.state.columns})
+
+    def query(self):
+        """只支持 SELECT ... FROM 表 [LIMIT n [OFFSET m]]，返回全部列"""
+        state = self.state
+        state.count('query')
+        length = int(self.headers.get('Content-Length') or 0)
+        request = json.loads(self.rfile.read(length) or b'{}')
+        if self.inject_failure():
+            return
+        match = re.match(r'\s*select\s+.+?\s+from\s+`?([^`\s]+)`?(?:\s+limit\s+(\d+))?(?:\s+offset\s+(\d+))?',
+                         request.get('sql', ''), re.IGNORECASE | re.DOTALL)
+        if not match:
+            return self.send_json(200, {'success': False, 'error_message': 'SQL not supported by mock server'})
+        table_name, limit, offset = match.group(1), int(match.group(2) or 100), int(match.group(3) or 0)
+        end = min(state.table_rows(table_name), offset + limit)
+        rows = [generate_row(index, state.extra_columns) for index in range(offset, end)]
+        if not state.api_gateway:
+            # dtable-db 返回以列 key 为键的行，由 seatable_api 按 metadata 转换为列名
+            keys = {column['name']: column['key'] for column in state.columns}
+            rows = [{keys.get(name, name): value for name, value in row.items()} for row in rows]
+        state.count('rows_sent', len(rows))
+        return self.send_json(200, {'success': True, 'metadata': state.columns, 'results': rows})
+
+    def do_GET(self):
+        self.handle_request('GET')
+
+    def do_POST(self):
+        self.handle_request('POST')
+
+
+def create_server(host='127.0.0.1', port=0, **options):
+    """创建模拟服务器（未启动），options 传给 MockState；port 为 0 时自动选择空闲端口"""
+    server = ThreadingHTTPServer((host, port), MockSeaTableHandler)
+    server.daemon_threads = True
+    server.state = MockState(**options)
+    return server
+
+
+def start_server(host='127.0.0.1', port=0, **options):
+    """在后台线程中启动模拟服务器，返回 (server, server_url)"""
+    server = create_server(host, port, **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def parse_tables(specs):
+    tables = {}
+    for spec in specs or []:
+        name, _, rows = spec.rpartition(':')
+        if not name or not rows.isdigit():
+            raise argparse.ArgumentTypeError(f"表格格式应为 名称:行数，而不是 '{spec}'")
+        tables[name] = int(rows)
+    return tables
+
+
+def add_server_arguments(parser):
+    """模拟服务器的命令行参数（压测脚本复用）"""
+    parser.add_argument('--extra-columns', type=int, default=0, help='额外的文本列数量（默认 0）')
+    parser.add_argument('--max-page-size', type=int, help='服务器单页最多返回的行数（模拟服务器端上限）')
+    parser.add_argument('--latency', type=float, default=0, help='每个请求的固定延迟（毫秒）')
+    parser.add_argument('--jitter', type=float, default=0, help='每个请求额外的随机延迟上限（毫秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='返回 502 的概率（0-1）')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='返回 429 的概率（0-1）')
+    parser.add_argument('--max-concurrency', type=int, help='同时处理的请求超过该值时返回 429')
+    parser.add_argument('--retry-after', type=float, default=1.0, help='429 响应的 Retry-After 秒数（默认 1）')
+    parser.add_argument('--api-gateway', action='store_true', help='认证结果中启用 API Gateway 接口')
+    parser.add_argument('--seed', type=int, help='注入错误使用的随机种子')
+
+
+def server_options(args):
+    return {
+        'extra_columns': args.extra_columns, 'max_page_size': args.max_page_size,
+        'latency_ms': args.latency, 'jitter_ms': args.jitter, 'error_rate': args.error_rate,
+        'throttle_rate': args.throttle_rate, 'max_concurrency': args.max_concurrency,
+        'retry_after': args.retry_after, 'api_gateway': args.api_gateway, 'seed': args.seed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='本地模拟 SeaTable 服务器')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8800, help='端口（0 表示自动选择）')
+    parser.add_argument('--rows', type=int, default=10000, help='未单独指定的表格的行数（默认 10000）')
+    parser.add_argument('--table', action='append', metavar='名称:行数', help='指定表格的行数，可重复')
+    parser.add_argument('--api-token', help='只接受该 API Token（默认接受任意 Token）')
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    server = create_server(args.host, args.port, default_rows=args.rows, tables=parse_tables(args.table),
+                           api_token=args.api_token, **server_options(args))
+    print(f"模拟 SeaTable 服务器已启动: http://{args.host}:{server.server_address[1]}")
+    sys.stdout.flush()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n已停止")
+
+
+if __name__ == '__main__':
+    main()
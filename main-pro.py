@@ -10,7 +10,7 @@ SeaTable Excel 生成器
     2. 支持多个配置文件，每个配置文件可以有不同的 SeaTable API 配置
     3. 自动格式化日期和数字
     4. 智能处理百分比数值（0-1小数自动转换为0-100百分比）
-    5. 使用 SUBTOTAL(109,...) 函数计算合计（只统计可见行）
+    5. 使用 SUBTOTAL(109,...) 函数计算合计（只统计可见行），同时写入精确累加的缓存值
     6. 支持文件合并功能
     7. 自动设置 Excel 样式和格式
 
@@ -18,6 +18,8 @@ SeaTable Excel 生成器
     每个 JSON 配置文件包含以下结构：
     {
         "date_version": "20241101",                    # 日期版本号
+        "retention": {"keep": 7, "keep_days": 30},     # 历史文件保留策略（可选），作为各条目的默认值
+        "compression": "fast",                         # XLSX 压缩级别（可选）：store/fast/default/max，作为各条目的默认值
         "seatable_config": {                           # SeaTable 配置（可选）
             "server_url": "https://your-server.com",   # SeaTable 服务器地址
             "api_token": "your-api-token"              # SeaTable API 令牌
@@ -32,9 +34,19 @@ SeaTable Excel 生成器
                 "view_name": "视图名称",               # 要使用的视图名称
                 "excel_directory": "output_dir",      # 输出目录的引用名称
                 "excel_file_name": "文件名.xlsx",      # 输出文件名
+                "target_workbook": "报表.xlsx",        # 共享工作簿（可选），设置后忽略 excel_file_name
                 "sheet_name": "工作表名称",            # 工作表名称（可选）
                 "sum_columns": ["金额列1", "金额列2"], # 需要计算合计的列名列表
-                "field_mapping": "all"                 # 字段映射配置（可选）
+                "field_mapping": "all",                # 字段映射配置（可选）
+                "skip_unchanged": true,                # 内容未变化时复用上次文件（可选，默认 true）
+                "page_size": 1000,                     # 分页获取数据时每页的行数（可选，默认 1000，SeaTable 每页最多返回 1000 行）
+                "totals_summary": "json",              # 合计汇总输出（可选）："json" 生成 .totals.json 文件，"sheet" 添加汇总工作表
+                "column_modes": {"附件": "summarise"},  # 按列指定处理方式（可选）：keep/skip/truncate/summarise/hyperlink
+                "retention": {"keep": 3},              # 该条目的历史文件保留策略（可选），覆盖顶层设置
+                "compression": "max",                  # 该条目的 XLSX 压缩级别（可选），覆盖顶层设置
+                "isolate": true,                       # 在独立的工作进程中生成（可选），false 表示从不隔离
+                "isolate_rows": 200000,                # 上次输出行数达到该值时自动隔离（可选，默认 200000）
+                "isolate_memory_mb": 4096              # 工作进程的内存上限（可选，仅 Linux/macOS，不低于 1024）
             }
         ],
         "combined_files": [                            # 文件合并配置（可选）
@@ -44,13 +56,25 @@ SeaTable Excel 生成器
                 "include_entries": [                   # 要合并的文件列表
                     "文件1.xlsx",
                     "文件2.xlsx"
-                ]
+                ],
+                "allow_stale_sources": false           # 是否允许合并非当天生成的源文件（可选，默认 false）
             }
         ]
     }
 
+列类型与格式:
+    程序会通过 list_columns 获取每个表格的列类型（缓存 10 分钟），并据此为每列一次性确定格式：
+    - 日期列（date/ctime/mtime，及日期结果的公式列）：只保留 yyyy-mm-dd
+    - 货币格式的数字列：#,##0.00（按列设置的精度）
+    - 百分比格式的数字列：0.00%（SeaTable 中存储的已经是小数，不再转换）
+    - 设置了精度的数字列：按精度显示；精度为 0 时按整数显示（适用于年份）
+    - 文本类列：不做日期或数字判断
+    - 未设置精度的数字列和类型未知的列：沿用按数值内容判断的方式（日期字符串、1900-2100 视为年份）
+    - 获取不到列信息（重试后仍失败、返回为空或缺少映射字段）时条目生成失败，不会生成格式退化的文件
+
 百分比列字段命名规则:
-    程序会自动识别包含以下关键词的列名作为百分比列：
+    对于列类型未知的列（如结果类型未知的公式列），程序会自动识别包含以下关键词的列名作为百分比列；
+    数字、货币、文本等有类型信息的列按类型处理，不按列名判断：
     - "比例" (如: "奖励比例S2")
     - "百分比" 
     - "percent"
@@ -82,16 +106,62 @@ SeaTable Excel 生成器
 注意事项:
     1. 如果没有合并需求，请完全移除 "combined_files" 配置项，不要保留空数组
     2. 百分比列名必须包含上述关键词才能被正确识别和处理
-    3. 生成的 Excel 文件会自动添加当前日期版本号（格式：@YYYYMMDD）
+    3. 生成的 Excel 文件会自动添加生成时的日期版本号（格式：@YYYYMMDD），跨过午夜的运行使用新的日期
     4. 目录引用功能可以大大简化配置文件，避免重复的路径定义
     5. 字段映射功能可以精确控制导出的字段和Excel列名，提高数据处理的灵活性
     6. 使用自定义字段映射时，确保所有引用的SeaTable字段都存在，否则程序会报错
+    7. 请求 SeaTable 遇到 429 或 5xx 错误时会按指数退避（带随机抖动）重试，并遵循 Retry-After；
+       视图数据分页获取，同一服务器的并行页数按 AIMD 策略自适应：成功时逐步增加，被限流时减半
+    8. 每个输出目录下会生成 .export_manifest.json 清单，记录各条目的内容指纹；
+       数据、字段映射、映射字段的列类型（含精度、货币等设置）、合计列和样式版本都未变化时，直接硬链接（或复制）上次的文件，不再重新生成
+    9. 合计在写入数据行时用 Decimal 精确累加，合计单元格仍是 SUBTOTAL 公式，但会同时写入缓存值（合并文件沿用源文件的缓存值）；
+       配置 totals_summary 后可额外输出各合计列的合计值和数值个数（.totals.json 文件或"合计汇总"工作表）
+    10. 程序会通过 list_columns 获取列类型（遇到限流或临时性错误时退避重试，仍然失败时该条目生成失败），
+       在清理数据前按列处理大文本和附件类字段：
+       - keep: 保持原有处理；skip: 输出空白
+       - truncate: 先截断到 32000 个字符再清理（长文本默认）
+       - summarise: 列表类字段输出数量（如 "3 个文件"），长文本输出前 100 个字符
+       - hyperlink: 输出第一个文件/图片的名称并设置为指向其 URL 的超链接（图片、文件默认）
+    11. 多个条目声明相同的 target_workbook（且 excel_directory 相同）时，会按 entries 中的顺序
+       以各自的 sheet_name 写入同一个工作簿，一次保存完成，无需再通过 combined_files 合并；
+       菜单中选择其中任一条目时，会重新生成整个共享工作簿
+    12. 安装了 msgspec 时，自定义 field_mapping 的条目在解码 SeaTable 响应时直接投影为所需字段，
+       未映射的字段不会被解析为 Python 对象；否则使用 orjson 或标准库 json 解码
+    13. .export_manifest.json 同时是输出索引，记录每个条目各日期版本的文件名、行数、大小和 SHA-256：
+       - 合并文件时按索引查找各条目最近一次生成的文件；最近的文件不是当天生成的（如当天生成失败）时
+         默认跳过该文件并给出警告，设置 allow_stale_sources 后才合并旧文件。批量模式中，
+         包含当次生成失败的条目的合并配置整体跳过
+       - retention 中 keep 为最多保留的版本数，keep_days 为保留的天数，超出的历史文件（含 .totals.json）
+         在生成后自动删除；最新版本始终保留，未配置 retention 时不删除任何文件，配置无效时在生成前报错
+    14. compression 控制 XLSX 的压缩方式：store 不压缩（保存最快、文件最大），fast 为 deflate 级别 1，
+       default 为 deflate 默认级别（未配置时使用），max 为级别 9（文件最小、保存最慢）；
+       优先级：条目设置 > 命令行 --compression > 配置文件顶层设置。
+       文本列中重复的值在生成时共用同一个字符串对象，降低大报表生成期间的内存占用
+    15. 设置了 isolate 或上次输出行数（来自输出索引）达到 isolate_rows 的工作簿，在独立的工作进程中生成：
+       - 工作进程的输出带 [文件名] 前缀转发到当前窗口，结果返回给主进程
+       - 工作进程崩溃、被系统因内存不足终止或超过 isolate_memory_mb 时，只有该工作簿失败，
+         交互菜单和批量模式中的其他条目继续执行
+       - isolate_memory_mb 通过 RLIMIT_AS 限制虚拟地址空间，Windows 上不生效。获取数据时最多有 8 个分页线程和进度线程，
+         每个线程的栈和内存分配区都计入地址空间，很小的表格也需要 700 MB 左右，建议不低于 1024 MB；过低时线程无法启动，
+         与内存不足一样报告为超过工作进程限制
+       - isolate、isolate_rows、isolate_memory_mb 也可以写在配置顶层，作为所有条目的默认值
+    16. 生成期间显示进度：获取行数（每页更新）、写入和设置格式的行数（每 1000 行更新）、行/秒、已获取的数据量和预计剩余时间；
+       获取阶段以输出索引中上次的行数作为预计总数，没有记录时不显示该阶段的剩余时间。
+       交互菜单中显示为单行进度条（输出被重定向时改为日志行），批量模式中每隔 --progress-interval 秒
+       输出 key=value 格式的进度日志行，每个进行中的工作簿一行，workbook=* 为整体进度
 
 使用方法:
     1. 运行程序: python main-pro.py
     2. 选择配置文件
     3. 选择要生成的文件或操作
 
+批量模式:
+    python main-pro.py --batch "configs/*.json" other.json --workers 8 --per-server 2 --compression fast --progress-interval 30
+    1. 所有配置文件的条目在同一个线程池中调度，每个配置使用自己的 seatable_config
+    2. --per-server 限制同一 SeaTable 服务器的并发条目数，避免触发限流
+    3. 条目全部完成后执行各配置的 combined_files，并输出包含耗时和失败原因的汇总报告
+    4. 有条目失败时进程以退出码 1 结束
+
 环境变量（可选）:
     如果配置文件中没有 seatable_config，可以在 .env 文件中设置：
     SEATABLE_SERVER_URL=https://your-seatable-server.com
@@ -122,15 +192,34 @@ Last Modified: 2025-8-4
 
 import json
 import os
+import time
 import argparse
+import multiprocessing
 from datetime import datetime
+from decimal import Decimal
+from functools import partial
 from seatable_api import Base
 from openpyxl import Workbook, load_workbook
 from openpyxl.styles import Font, Alignment, Border, Side, PatternFill, NamedStyle
 from openpyxl.utils import get_column_letter
 from dotenv import load_dotenv
-from utils.excel_utils import apply_styles, adjust_column_width, save_excel_file, currency_format
+from utils.excel_utils import (apply_styles, adjust_column_width, save_workbook, save_excel_file, currency_format,
+                               build_totals_summary, add_totals_summary_sheet, write_totals_sidecar,
+                               get_zip_options, read_cached_values, COMPRESSION_LEVELS)
 from utils.config_utils import load_and_interpolate_config
+from utils.seatable_api_helper import (auth_with_retry, list_rows_paged, make_projected_rows_decoder,
+                                      DEFAULT_PAGE_SIZE)
+from utils.batch_runner import expand_config_paths, run_batch, print_batch_report
+from utils.column_utils import (fetch_column_metadata, build_column_handlers, project_rows, build_column_formats, date_part,
+                                build_string_pools,
+                                KIND_DATE, KIND_PERCENT, KIND_NUMBER, KIND_AUTO)
+from utils.manifest_utils import (
+    start_entry_fingerprint, update_entry_fingerprint, combine_fingerprints, reuse_unchanged_output,
+    record_output, forget_output, apply_retention, validate_retention, get_last_row_count, get_latest_output_path,
+)
+from utils.isolation_utils import run_isolated
+from utils.progress_utils import (ProgressMonitor, MODE_LOG, LOG_INTERVAL, PROGRESS_BATCH_ROWS,
+                                  PHASE_WRITE, PHASE_FORMAT, PHASE_SAVE, PHASE_ISOLATED)
 import re
 
 # 加载 .env 文件中的环境变量
@@ -198,6 +287,9 @@ def get_excel_directory(config, directory_ref):
     else:
         raise ValueError(f"未找到目录引用 '{directory_ref}'，请检查配置文件中的 excel_directories 定义")
 
+# 可以在配置顶层设置、作为各条目（及合并文件）默认值的配置项
+ENTRY_DEFAULT_KEYS = ('retention', 'compression', 'isolate', 'isolate_rows', 'isolate_memory_mb')
+
 def resolve_entries_with_directories(config):
     """解析entries配置，将目录引用替换为实际路径"""
     entries = config.get('entries', [])
@@ -206,6 +298,16 @@ def resolve_entries_with_directories(config):
     for entry in entries:
         resolved_entry = entry.copy()
         
+        # 顶层的 ENTRY_DEFAULT_KEYS（保留策略、压缩级别和隔离设置）作为所有条目的默认值
+        for key in ENTRY_DEFAULT_KEYS:
+            if key in config:
+                resolved_entry.setdefault(key, config[key])
+        # 无效的压缩级别和保留策略在生成前报错
+        if 'compression' in resolved_entry:
+            get_zip_options(resolved_entry['compression'])
+        if 'retention' in resolved_entry:
+            validate_retention(resolved_entry['retention'])
+        
         # 处理excel_directory
         if 'excel_directory' in resolved_entry:
             directory_ref = resolved_entry['excel_directory']
@@ -219,11 +321,19 @@ def resolve_entries_with_directories(config):
             if 'output_directory' in combined_config:
                 directory_ref = combined_config['output_directory']
                 combined_config['output_directory'] = get_excel_directory(config, directory_ref)
+            for key in ENTRY_DEFAULT_KEYS:
+                if key in config:
+                    combined_config.setdefault(key, config[key])
+            if 'compression' in combined_config:
+                get_zip_options(combined_config['compression'])
+            if 'retention' in combined_config:
+                validate_retention(combined_config['retention'])
     
     return resolved_entries
 
-# 获取当前系统日期版本
-current_date_version = datetime.now().strftime('%Y%m%d')
+def get_date_version():
+    """获取当前系统日期版本（每次生成时计算，跨过午夜的长时间运行也能得到正确日期）"""
+    return datetime.now().strftime('%Y%m%d')
 
 def get_column_index_by_name(sheet, column_name):
     """根据列名获取 Excel 中的列索引，假设第1行是标题，第2行是表头"""
@@ -232,13 +342,17 @@ def get_column_index_by_name(sheet, column_name):
             return col
     raise ValueError(f"Column '{column_name}' not found in Excel sheet.")
 
+# 逐单元格调用的正则在模块加载时编译一次
+# 匹配类似 2025-01-20T00:00:00+08:00 的格式
+DATE_STRING_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}')
+# Excel 不接受的控制字符（保留 \t \n \r）
+CONTROL_CHARS_PATTERN = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
 def is_date_string(value):
     """检查字符串是否为日期格式"""
     if not isinstance(value, str):
         return False
-    # 匹配类似 2025-01-20T00:00:00+08:00 的格式
-    date_pattern = r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}'
-    return bool(re.match(date_pattern, value))
+    return DATE_STRING_PATTERN.match(value) is not None
 
 def clean_value_for_excel(value):
     """清理数据，确保Excel能正确处理"""
@@ -253,10 +367,8 @@ def clean_value_for_excel(value):
         value = value[0] if isinstance(value[0], (str, int, float)) else str(value[0])
     
     if isinstance(value, str):
-        # 移除控制字符
-        value = ''.join(char for char in value if ord(char) >= 32 or char in '\n\r\t')
-        # 移除可能导致Excel问题的字符
-        value = value.replace('\x00', '').replace('\x01', '').replace('\x02', '')
+        # 移除控制字符（包括可能导致Excel问题的 \x00-\x02）
+        value = CONTROL_CHARS_PATTERN.sub('', value)
         # 限制字符串长度
         if len(value) > 32000:
             value = value[:32000]
@@ -340,6 +452,39 @@ def format_date(value):
         return value.split('T')[0]
     return value
 
+def normalize_percentage_value(value, column_name):
+    """按列名识别的百分比列：统一为小数（0.25 表示 25%），由 Excel 百分比格式显示"""
+    # 只有在需要转换时才进行转换
+    if should_convert_to_percentage(value, column_name):
+        value = format_percentage_value(value)
+    if isinstance(value, (int, float)) and 0 <= value <= 100:
+        value = value / 100
+    return value
+
+def build_value_converters(seatable_fields, column_formats):
+    """根据列格式为每列预先选定值转换函数和数字格式，返回 (converters, number_formats)"""
+    converters = []
+    number_formats = []
+    for seatable_field, column_format in zip(seatable_fields, column_formats):
+        number_format = column_format.number_format
+        if column_format.kind == KIND_DATE:
+            converter = date_part
+        elif column_format.kind == KIND_PERCENT:
+            # SeaTable 百分比列存储的已经是小数
+            converter = None
+        elif column_format.kind == KIND_AUTO:
+            if is_percentage_column(seatable_field):
+                # 只有没有列类型信息时，才按列名关键词识别百分比并归一化
+                converter = partial(normalize_percentage_value, column_name=seatable_field)
+                number_format = '0.00%'
+            else:
+                converter = format_date
+        else:
+            converter = None
+        converters.append(converter)
+        number_formats.append(number_format)
+    return converters, number_formats
+
 def get_field_mapping(entry, all_columns):
     """获取字段映射，支持 'all' 模式和自定义映射"""
     field_mapping = entry.get('field_mapping', 'all')
@@ -368,29 +513,171 @@ def validate_field_mapping(field_mapping, available_columns):
     
     return True
 
-def create_excel_file(entries, seatable_config):
+def connect_base(seatable_config):
+    """连接并认证 SeaTable Base"""
     base = Base(seatable_config['api_token'], seatable_config['server_url'])
-    base.auth()
+    # 遇到限流（429）或临时性服务器错误时自动退避重试
+    auth_with_retry(base)
     #base.use_api_gateway = False
+    return base
+
+def create_excel_file(entries, seatable_config):
+    base = connect_base(seatable_config)
+    groups = group_entries_by_workbook(entries)
     
+    # 交互窗口中显示进度条，输出被重定向时改为定期输出进度日志行
+    with ProgressMonitor() as monitor:
+        trackers = [track_workbook(monitor, group) for group in groups]
+        for group, progress in zip(groups, trackers):
+            export_workbook(base, group, progress)
+
+def get_previous_row_count(group):
+    """输出索引中该工作簿上次生成的行数（合并后已删除的源文件也保留行数），没有记录时返回 None"""
+    first_entry = group[0]
+    return get_last_row_count(first_entry['excel_directory'], get_entry_output_name(first_entry))
+
+def track_workbook(monitor, group):
+    """登记工作簿的进度计数，以上次生成的行数作为获取阶段的预计行数"""
+    return monitor.track(get_entry_output_name(group[0]), expected_rows=get_previous_row_count(group))
+
+# 上次输出的行数达到该值的工作簿在独立的工作进程中生成
+DEFAULT_ISOLATE_ROWS = 200000
+
+def should_isolate(group):
+    """判断工作簿是否需要在独立的工作进程中生成
+
+    条目设置 isolate 时按设置执行；否则按输出索引中上次生成的行数与 isolate_rows 比较。
+    """
+    first_entry = group[0]
+    if any(entry.get('isolate') for entry in group):
+        return True
+    if any(entry.get('isolate') is False for entry in group):
+        return False
+    previous_rows = get_previous_row_count(group)
+    return bool(previous_rows and previous_rows >= first_entry.get('isolate_rows', DEFAULT_ISOLATE_ROWS))
+
+def export_workbook_in_process(seatable_config, group):
+    """工作进程入口：重新连接 SeaTable 后生成工作簿"""
+    base = connect_base(seatable_config)
+    # 工作进程的输出由主进程转发，进度按日志行输出
+    with ProgressMonitor(MODE_LOG) as monitor:
+        progress = track_workbook(monitor, group)
+        result = export_workbook_group(base, group, progress)
+        progress.finish(result['status'], rows=result['rows'])
+    return result
+
+def export_workbook(base, group, progress=None):
+    """生成一个工作簿，大条目在独立的工作进程中生成
+
+    progress 为 track_workbook 返回的进度计数（可选），生成结束后标记为完成。
+    """
+    try:
+        if should_isolate(group):
+            result = export_workbook_isolated(base, group, progress)
+        else:
+            result = export_workbook_group(base, group, progress)
+    except Exception:
+        if progress is not None:
+            progress.finish('failed')
+        raise
+    if progress is not None:
+        progress.finish(result['status'], rows=result['rows'])
+    return result
+
+def export_workbook_isolated(base, group, progress=None):
+    """在独立的工作进程中生成工作簿
+
+    工作进程可以通过 isolate_memory_mb 限制内存（RLIMIT_AS，仅 POSIX 系统）；
+    工作进程崩溃或超过内存限制时返回失败结果，不影响当前会话和其他条目。
+    """
+    if progress is not None:
+        progress.start_phase(PHASE_ISOLATED)
+    output_name = get_entry_output_name(group[0])
+    memory_mb = group[0].get('isolate_memory_mb')
+    print(f"在独立的工作进程中生成 '{output_name}'" + (f"（内存限制 {memory_mb} MB）" if memory_mb else "") + "...")
+    seatable_config = {'api_token': base.token, 'server_url': base.server_url}
+    result, error = run_isolated(export_workbook_in_process, (seatable_config, group), output_name, memory_mb=memory_mb)
+    if error is not None:
+        print(f"错误: 生成 '{output_name}' 的工作进程失败: {error}")
+        return {'status': 'failed', 'file': None, 'rows': 0, 'error': error.splitlines()[0]}
+    return result
+
+def get_entry_output_name(entry):
+    """条目输出的工作簿文件名（不含日期版本）"""
+    return entry.get('target_workbook') or entry['excel_file_name']
+
+def add_date_version(file_name, date_version):
+    """在文件名后加上日期版本"""
+    file_name_without_extension, file_extension = os.path.splitext(file_name)
+    return f"{file_name_without_extension}@{date_version}{file_extension}"
+
+def group_entries_by_workbook(entries):
+    """按输出工作簿分组：声明了相同 target_workbook 的条目写入同一个工作簿，其余条目各自一组"""
+    groups = []
+    shared_groups = {}
     for entry in entries:
-        table_name = entry['table_name']
-        view_name = entry['view_name']
-        excel_directory = entry['excel_directory']
-        excel_file_name = entry['excel_file_name']
-        sheet_name = entry.get('sheet_name', view_name)  # 使用 sheet_name
-        sum_columns = entry['sum_columns']
-        
-        # 在文件名后加上系统日期版本
-        file_name_without_extension, file_extension = os.path.splitext(excel_file_name)
-        excel_file_name = f"{file_name_without_extension}@{current_date_version}{file_extension}"
+        if entry.get('target_workbook'):
+            key = (entry['excel_directory'], entry['target_workbook'])
+            if key not in shared_groups:
+                shared_groups[key] = []
+                groups.append(shared_groups[key])
+            shared_groups[key].append(entry)
+        else:
+            groups.append([entry])
+    return groups
 
-        print(f"从 SeaTable 视图 '{view_name}' 获取数据...")
-        rows = base.list_rows(table_name, view_name=view_name)
-        
+def select_workbook_entries(entries, index):
+    """选择单个条目时，同一共享工作簿中的其他条目也一起生成，避免工作簿只剩一个工作表"""
+    selected = entries[index]
+    if not selected.get('target_workbook'):
+        return [selected]
+    return [entry for entry in entries
+            if entry.get('target_workbook') == selected['target_workbook']
+            and entry['excel_directory'] == selected['excel_directory']]
+
+def prepare_entry(base, entry, progress=None):
+    """获取条目数据并确定字段映射，返回准备好的条目；没有数据或映射错误时返回结果字典
+
+    映射字段必须都有列信息：没有列类型时生成的文件格式会退化，这样的文件不记录到输出索引，
+    也不会被复用或合并，而是让条目失败。
+    """
+    table_name = entry['table_name']
+    view_name = entry['view_name']
+    sum_columns = entry['sum_columns']
+    page_size = entry.get('page_size', DEFAULT_PAGE_SIZE)
+    field_mapping = entry.get('field_mapping', 'all')
+    try:
+        column_metadata = fetch_column_metadata(base, table_name)
+    except Exception as e:
+        print(f"错误: 获取表格 '{table_name}' 的列信息失败: {e}")
+        return None, {'status': 'failed', 'file': None, 'rows': 0, 'error': f"获取列信息失败: {e}"}
+    if not column_metadata:
+        print(f"错误: 表格 '{table_name}' 没有返回列信息")
+        return None, {'status': 'failed', 'file': None, 'rows': 0, 'error': "没有获取到列信息"}
+    # 每收到一页更新一次获取行数和字节数
+    on_page = progress.add_fetched if progress is not None else None
+
+    print(f"从 SeaTable 视图 '{view_name}' 获取数据...")
+    # 分页并行获取，并发数按服务器的限流反馈自适应调整（AIMD）
+    # 每行都投影为 (_id, 映射字段...) 元组，_ 开头的系统字段和未映射的字段不保留
+    if isinstance(field_mapping, dict):
+        # 自定义映射：先按列信息校验映射，解码响应时直接投影，跳过未映射的字段
+        try:
+            validate_field_mapping(field_mapping, column_metadata.keys())
+        except ValueError as e:
+            print(f"字段映射错误: {e}")
+            return None, {'status': 'failed', 'file': None, 'rows': 0, 'error': f"字段映射错误: {e}"}
+        decode_page = make_projected_rows_decoder(['_id'] + list(field_mapping.keys()), {'_id': None})
+        rows = list_rows_paged(base, table_name, view_name=view_name, page_size=page_size,
+                               decode_page=decode_page, on_page=on_page)
         if not rows:
             print(f"视图 '{view_name}' 没有找到数据，跳过...")
-            continue
+            return None, {'status': 'empty', 'file': None, 'rows': 0}
+    else:
+        rows = list_rows_paged(base, table_name, view_name=view_name, page_size=page_size, on_page=on_page)
+        if not rows:
+            print(f"视图 '{view_name}' 没有找到数据，跳过...")
+            return None, {'status': 'empty', 'file': None, 'rows': 0}
         
         # Filter out columns starting with _
         all_columns = [col for col in rows[0].keys() if not col.startswith('_')]
@@ -401,126 +688,276 @@ def create_excel_file(entries, seatable_config):
             validate_field_mapping(field_mapping, all_columns)
         except ValueError as e:
             print(f"字段映射错误: {e}")
-            continue
-        
-        # 获取Excel列名（按映射顺序）
-        excel_columns = list(field_mapping.values())
-        seatable_fields = list(field_mapping.keys())
-        
-        # 检查哪些列不存在
-        missing_columns = [col for col in sum_columns if col not in excel_columns]
-        if missing_columns:
-            print(f"警告: 以下列在数据中未找到: {missing_columns}")
-        
-        # Create Excel file
-        print(f"创建 Excel 文件 '{excel_file_name}'...")
-        wb = Workbook()
-        ws = wb.active
-        ws.title = sheet_name
-        
-        # Write data with date formatting
-        ws.append(excel_columns)
-        for row_idx, row in enumerate(rows, start=2):
+            return None, {'status': 'failed', 'file': None, 'rows': len(rows), 'error': f"字段映射错误: {e}"}
+        project_rows(rows, ['_id'] + list(field_mapping.keys()), {'_id': None})
+
+        # 数据中有而列信息中没有的字段：可能是缓存期间新增的列，刷新一次列信息
+        if any(field not in column_metadata for field in field_mapping):
             try:
-                filtered_row = []
-                for seatable_field in seatable_fields:
-                    value = row.get(seatable_field, '')
-                    
-                    # 清理数据，确保Excel能正确处理
-                    value = clean_value_for_excel(value)
-                    
-                    # 处理百分比列
-                    if is_percentage_column(seatable_field):
-                        original_value = value
-                        # 只有在需要转换时才进行转换
-                        if should_convert_to_percentage(value, seatable_field):
-                            value = format_percentage_value(value)
-                    
-                    filtered_row.append(format_date(value))
-                ws.append(filtered_row)
+                column_metadata = fetch_column_metadata(base, table_name, refresh=True)
             except Exception as e:
-                print(f"警告: 处理第 {row_idx} 行数据时出错: {e}")
-                print(f"  错误详情: 数据类型={type(row)}, 数据内容={repr(row)}")
-                # 尝试写入空行或跳过
-                ws.append([''] * len(excel_columns))
-
-        # Set styles and adjust column widths
-        for row in ws.iter_rows(min_row=1, max_row=ws.max_row, max_col=len(excel_columns)):
-            for cell in row:
-                is_header = cell.row == 1
-                apply_styles(cell, is_header=is_header)
+                print(f"错误: 获取表格 '{table_name}' 的列信息失败: {e}")
+                return None, {'status': 'failed', 'file': None, 'rows': len(rows), 'error': f"获取列信息失败: {e}"}
+        fields_without_metadata = [field for field in field_mapping if field not in column_metadata]
+        if fields_without_metadata:
+            print(f"错误: 以下字段没有列信息: {fields_without_metadata}")
+            return None, {'status': 'failed', 'file': None, 'rows': len(rows),
+                          'error': f"以下字段没有列信息: {fields_without_metadata}"}
+    
+    # 检查哪些列不存在
+    missing_columns = [col for col in sum_columns if col not in field_mapping.values()]
+    if missing_columns:
+        print(f"警告: 以下列在数据中未找到: {missing_columns}")
+    
+    # 计算内容指纹，并去掉只用于指纹的 _id
+    hasher = start_entry_fingerprint(entry, field_mapping, column_metadata)
+    for row_index, row in enumerate(rows):
+        values = row[1:]
+        update_entry_fingerprint(hasher, row[0], values)
+        rows[row_index] = values
+    
+    prepared = {
+        'entry': entry,
+        'rows': rows,
+        'field_mapping': field_mapping,
+        'column_metadata': column_metadata,
+        'fingerprint': hasher.hexdigest(),
+    }
+    return prepared, None
+
+def export_workbook_group(base, group, progress=None):
+    """生成一个工作簿：单个条目的独立文件，或多个条目共享的多工作表文件
+
+    共享工作簿的所有工作表在一次写入中完成，不再经过 生成 → 重新加载 → 合并 → 删除 的过程。
+    """
+    first_entry = group[0]
+    excel_directory = first_entry['excel_directory']
+    output_name = get_entry_output_name(first_entry)
+    date_version = get_date_version()
+    excel_file_name = add_date_version(output_name, date_version)
+    excel_file_path = os.path.join(excel_directory, excel_file_name)
+
+    prepared_entries = []
+    for entry in group:
+        prepared, result = prepare_entry(base, entry, progress)
+        if prepared is None:
+            # 共享工作簿中某个条目映射错误时整个工作簿失败，空视图则只跳过该工作表
+            if result['status'] == 'failed' or len(group) == 1:
+                return result
+            continue
+        prepared_entries.append(prepared)
+    if not prepared_entries:
+        return {'status': 'empty', 'file': None, 'rows': 0}
+    row_count = sum(len(prepared['rows']) for prepared in prepared_entries)
+
+    # 内容指纹未变化时直接复用上次的输出文件
+    if len(prepared_entries) == 1:
+        fingerprint = prepared_entries[0]['fingerprint']
+    else:
+        fingerprint = combine_fingerprints([prepared['fingerprint'] for prepared in prepared_entries])
+    if all(entry.get('skip_unchanged', True) for entry in group) and reuse_unchanged_output(
+            excel_directory, output_name, fingerprint, excel_file_name, date_version=date_version):
+        print(f"'{output_name}' 的数据和配置未变化，复用上次生成的文件 '{excel_file_name}'。")
+        apply_retention(excel_directory, output_name, **first_entry.get('retention', {}))
+        return {'status': 'reused', 'file': excel_file_path, 'rows': row_count}
+
+    # Create Excel file
+    print(f"创建 Excel 文件 '{excel_file_name}'...")
+    if progress is not None:
+        progress.start_phase(PHASE_WRITE, total_rows=row_count)
+    wb = Workbook()
+    wb.remove(wb.active)  # 删除默认空白表
+    cached_values = {}
+    summaries = []
+    for prepared in prepared_entries:
+        entry = prepared['entry']
+        sheet_name = entry.get('sheet_name', entry['view_name'])  # 使用 sheet_name
+        if sheet_name in wb.sheetnames:
+            print(f"警告: 工作表名称 '{sheet_name}' 重复，将自动重命名")
+        ws = wb.create_sheet(title=sheet_name)
+        sheet_cached_values, summary = write_entry_sheet(ws, prepared, progress)
+        cached_values[ws.title] = sheet_cached_values
+        summaries.append(summary)
+        # 写完即释放行数据
+        prepared['rows'] = None
+
+    # 合计汇总（可选）：汇总工作表或 JSON 文件，无需重新打开工作簿即可读取
+    totals_summary = next((entry['totals_summary'] for entry in group if entry.get('totals_summary')), None)
+    if totals_summary == 'sheet':
+        add_totals_summary_sheet(wb, summaries)
+    
+    # Save Excel file
+    if progress is not None:
+        progress.start_phase(PHASE_SAVE)
+    save_excel_file(wb, excel_directory, excel_file_name, cached_values=cached_values,
+                    compression=first_entry.get('compression'))
+    if totals_summary == 'json':
+        write_totals_sidecar(excel_file_path, summaries)
+    record_output(excel_directory, output_name, fingerprint, excel_file_name,
+                  date_version=date_version, rows=row_count)
+    apply_retention(excel_directory, output_name, **first_entry.get('retention', {}))
+    return {'status': 'created', 'file': excel_file_path, 'rows': row_count}
+
+def write_entry_sheet(ws, prepared, progress=None):
+    """把一个条目的数据写入工作表，返回 (合计单元格缓存值, 合计汇总)
+
+    progress 不为 None 时，每写入（设置格式）PROGRESS_BATCH_ROWS 行更新一次进度。
+    """
+    entry = prepared['entry']
+    rows = prepared['rows']
+    field_mapping = prepared['field_mapping']
+    sum_columns = entry['sum_columns']
+    
+    # 获取Excel列名（按映射顺序）
+    excel_columns = list(field_mapping.values())
+    seatable_fields = list(field_mapping.keys())
+    
+    # 按列类型预先选定大文本、图片、文件等列的处理方式，以及每列的值转换和数字格式
+    column_metadata = prepared['column_metadata']
+    column_handlers, hyperlink_indexes = build_column_handlers(
+        seatable_fields, column_metadata, entry.get('column_modes'))
+    column_formats = build_column_formats(seatable_fields, column_metadata)
+    value_converters, number_formats = build_value_converters(seatable_fields, column_formats)
+    string_pools = build_string_pools(column_formats)
+    # 只有无类型信息的列和未设置精度的数字列，才按数值范围判断年份
+    year_check_indexes = {index for index, column_format in enumerate(column_formats)
+                          if column_format.kind in (KIND_AUTO, KIND_NUMBER)}
+    
+    # 合计列：在写入行的同时转换为数字，并用 Decimal 精确累加合计值
+    sum_column_indexes = {}
+    for col in sum_columns:
+        if col in excel_columns and col not in sum_column_indexes.values():
+            sum_column_indexes[excel_columns.index(col)] = col
+    totals = {index: Decimal(0) for index in sum_column_indexes}
+    counts = {index: 0 for index in sum_column_indexes}
+    
+    # Write data with date formatting
+    if progress is not None:
+        progress.start_phase(PHASE_WRITE)
+    ws.append(excel_columns)
+    for row_idx, row in enumerate(rows, start=2):
+        try:
+            filtered_row = []
+            row_links = []
+            for index, value in enumerate(row):
                 
-                # 检查是否是年份列，并设置为整数格式
-                if isinstance(cell.value, (int, float)) and 1900 <= cell.value <= 2100:
-                    cell.number_format = '0'  # 将年份设置为整数显示
+                # 按列类型先行处理（跳过、截断、摘要、超链接），再做逐字符清理
+                handler = column_handlers[index]
+                if handler is not None:
+                    value = handler(value)
+                    if index in hyperlink_indexes and isinstance(value, tuple):
+                        value, url = value
+                        row_links.append((index, url))
                 
-                # 设置百分比列的格式
-                if cell.row > 1 and cell.column <= len(seatable_fields):
-                    seatable_field = seatable_fields[cell.column - 1]
-                    if is_percentage_column(seatable_field):
-                        if isinstance(cell.value, (int, float)):
-                            # 对于百分比列，将数值除以100，这样Excel的百分比格式会正确显示
-                            if 0 <= cell.value <= 100:
-                                cell.value = cell.value / 100
-                            cell.number_format = '0.00%'  # 设置为百分比格式
-
-        adjust_column_width(ws)
-
-        # Convert text-formatted numbers to actual number format and apply currency format
-        for col in sum_columns:
-            try:
-                col_index = excel_columns.index(col) + 1
-                col_letter = get_column_letter(col_index)
-                for cell in ws[col_letter]:
-                    if cell.row != 1:
-                        try:
-                            if cell.value is not None and str(cell.value).strip():
-                                cell.value = float(cell.value)
-                                cell.number_format = '#,##0.00'
-                        except (ValueError, TypeError) as e:
-                            print(f"警告: 单元格 {cell.coordinate} 的值 '{cell.value}' 无法转换为数字")
-                            pass
-            except ValueError as e:
-                print(f"警告: 列 '{col}' 在数据中未找到，跳过该列的格式化")
+                # 清理数据，确保Excel能正确处理
+                value = clean_value_for_excel(value)
+                
+                # 按列预先确定的转换（日期截取、百分比归一化等）
+                converter = value_converters[index]
+                if converter is not None:
+                    value = converter(value)
+
+                # 高重复率的文本列共用同一个字符串对象
+                string_pool = string_pools[index]
+                if string_pool is not None:
+                    value = string_pool(value)
+
+                filtered_row.append(value)
+            
+            row_totals = []
+            for index in sum_column_indexes:
+                value = filtered_row[index]
+                if value is None or not str(value).strip():
+                    continue
+                try:
+                    filtered_row[index] = float(value)
+                except (ValueError, TypeError):
+                    print(f"警告: 单元格 {get_column_letter(index + 1)}{row_idx} 的值 '{value}' 无法转换为数字")
+                    continue
+                row_totals.append((index, Decimal(repr(filtered_row[index]))))
+            
+            ws.append(filtered_row)
+            for index, url in row_links:
+                ws.cell(row=row_idx, column=index + 1).hyperlink = url
+            for index, amount in row_totals:
+                totals[index] += amount
+                counts[index] += 1
+        except MemoryError:
+            # 内存不足（如超过工作进程的内存限制）时不再逐行重试，让整个工作簿失败
+            raise
+        except Exception as e:
+            print(f"警告: 处理第 {row_idx} 行数据时出错: {e}")
+            print(f"  错误详情: 数据类型={type(row)}, 数据内容={repr(row)}")
+            # 尝试写入空行或跳过
+            ws.append([''] * len(excel_columns))
+        if progress is not None and (row_idx - 1) % PROGRESS_BATCH_ROWS == 0:
+            progress.add_written(PROGRESS_BATCH_ROWS)
+    if progress is not None:
+        progress.add_written(len(rows) % PROGRESS_BATCH_ROWS)
+
+    # Set styles and adjust column widths
+    if progress is not None:
+        progress.start_phase(PHASE_FORMAT)
+    for row_number, row in enumerate(ws.iter_rows(min_row=1, max_row=ws.max_row, max_col=len(excel_columns))):
+        for cell in row:
+            is_header = cell.row == 1
+            apply_styles(cell, is_header=is_header)
+            if is_header or not isinstance(cell.value, (int, float)):
                 continue
+            
+            index = cell.column - 1
+            if index in sum_column_indexes:
+                # 合计列统一使用金额格式，不按年份处理
+                if isinstance(cell.value, float):
+                    cell.number_format = '#,##0.00'
+            elif number_formats[index] is not None:
+                cell.number_format = number_formats[index]
+            # 检查是否是年份列，并设置为整数格式
+            elif index in year_check_indexes and 1900 <= cell.value <= 2100:
+                cell.number_format = '0'  # 将年份设置为整数显示
+        if progress is not None and row_number and row_number % PROGRESS_BATCH_ROWS == 0:
+            progress.add_formatted(PROGRESS_BATCH_ROWS)
+    if progress is not None:
+        progress.add_formatted(len(rows) % PROGRESS_BATCH_ROWS)
+
+    adjust_column_width(ws)
+
+    # Calculate and add total row
+    cached_values = {}
+    if sum_columns:
+        total_row = ws.max_row + 1
+        ws[f"A{total_row}"] = "合计"
+        for index, col in sum_column_indexes.items():
+            try:
+                col_letter = get_column_letter(index + 1)
+                # 使用更安全的公式写法，避免特殊字符问题
+                formula = f"=SUBTOTAL(109,{col_letter}2:{col_letter}{total_row - 1})"
+                ws[f"{col_letter}{total_row}"] = formula
+                ws[f"{col_letter}{total_row}"].style = currency_format
+                # 同时写入公式的缓存值，下游解析程序不重新计算也能读到合计
+                cached_values[f"{col_letter}{total_row}"] = totals[index]
             except Exception as e:
-                print(f"错误: 处理列 '{col}' 时出错: {e}")
+                print(f"错误: 为列 '{col}' 添加合计公式时出错: {e}")
                 continue
 
-        # Calculate and add total row
-        if sum_columns:
-            total_row = ws.max_row + 1
-            ws[f"A{total_row}"] = "合计"
-            for col in sum_columns:
-                try:
-                    col_index = excel_columns.index(col) + 1
-                    col_letter = get_column_letter(col_index)
-                    # 使用更安全的公式写法，避免特殊字符问题
-                    formula = f"=SUBTOTAL(109,{col_letter}2:{col_letter}{total_row - 1})"
-                    ws[f"{col_letter}{total_row}"] = formula
-                    ws[f"{col_letter}{total_row}"].style = currency_format
-                except ValueError as e:
-                    print(f"警告: 列 '{col}' 在数据中未找到，跳过该列的合计计算")
-                    continue
-                except Exception as e:
-                    print(f"错误: 为列 '{col}' 添加合计公式时出错: {e}")
-                    continue
+        # Apply bold style to total row, similar to header
+        for cell in ws[total_row]:
+            apply_styles(cell, is_header=True)  # Use header style for total row
 
-            # Apply bold style to total row, similar to header
-            for cell in ws[total_row]:
-                apply_styles(cell, is_header=True)  # Use header style for total row
+    # Remove Excel gridlines
+    ws.sheet_view.showGridLines = False
 
-        # Remove Excel gridlines
-        ws.sheet_view.showGridLines = False
+    # Set header row as filter
+    ws.auto_filter.ref = ws.dimensions
+    
+    summary = build_totals_summary(ws.title, len(rows), sum_column_indexes, totals, counts)
+    return cached_values, summary
 
-        # Set header row as filter
-        ws.auto_filter.ref = ws.dimensions
-        
-        # Save Excel file
-        save_excel_file(wb, excel_directory, excel_file_name)
+def combine_excel_files(combined_file_configs, failed_entries=None):
+    """合并多个 Excel 文件
 
-def combine_excel_files(combined_file_configs):
-    """合并多个 Excel 文件"""
+    failed_entries 为本次生成失败的条目输出文件名集合（批量模式），包含这些条目的合并配置不执行。
+    """
     if not combined_file_configs:
         print("没有配置合并文件，跳过合并操作。")
         return
@@ -540,23 +977,40 @@ def combine_excel_files(combined_file_configs):
         
         output_directory = combined_file_config['output_directory']
         output_file_name = combined_file_config['output_file_name']
-        output_file_name_with_date = output_file_name.replace(".xlsx", f"@{current_date_version}.xlsx")
+        date_version = get_date_version()
+        output_file_name_with_date = add_date_version(output_file_name, date_version)
         
         include_entries = combined_file_config['include_entries']
+        failed_sources = [entry_file for entry_file in include_entries if entry_file in (failed_entries or ())]
+        if failed_sources:
+            print(f"警告: 源文件 {failed_sources} 本次生成失败，跳过合并 '{output_file_name}'")
+            continue
+        allow_stale_sources = combined_file_config.get('allow_stale_sources', False)
 
         combined_wb = Workbook()
         combined_ws = combined_wb.active
         combined_ws.title = "Combined"
         combined_wb.remove(combined_ws)  # 删除默认空白表
 
+        source_file_paths = {}
+        cached_values = {}
+        merged_rows = 0
         for entry_file in include_entries:
-            file_name_with_date = entry_file.replace(".xlsx", f"@{current_date_version}.xlsx")
-            entry_file_path = os.path.join(output_directory, file_name_with_date)
+            # 优先通过输出索引找到条目最近一次生成的文件，没有记录时按当天日期版本查找
+            entry_file_path = (get_latest_output_path(output_directory, entry_file)
+                               or os.path.join(output_directory, add_date_version(entry_file, date_version)))
 
             if not os.path.exists(entry_file_path):
                 print(f"文件 '{entry_file_path}' 未找到，跳过...")
                 continue
+            if os.path.basename(entry_file_path) != add_date_version(entry_file, date_version):
+                # 最近的文件不是当天生成的，合并后会以当天的日期版本保存
+                if not allow_stale_sources:
+                    print(f"警告: '{entry_file}' 今天没有生成新文件，最近的文件 '{entry_file_path}' 不是当天的，跳过...")
+                    continue
+                print(f"警告: '{entry_file}' 今天没有生成新文件，合并最近的文件 '{entry_file_path}'")
 
+            source_file_paths[entry_file] = entry_file_path
             entry_wb = load_workbook(filename=entry_file_path)
             entry_ws = entry_wb.active
             combined_ws = combined_wb.create_sheet(title=entry_ws.title)
@@ -568,8 +1022,17 @@ def combine_excel_files(combined_file_configs):
                 if cell.number_format in ['#,##0.00', '#,##0', '0.00']:
                     number_format_columns.append(col)
 
+            formula_cells = []
             for row in entry_ws.iter_rows(values_only=False):
                 combined_ws.append([cell.value for cell in row])
+                formula_cells.extend(cell.coordinate for cell in row if cell.data_type == 'f')
+            # 合计公式复制后没有缓存值，从源文件读取生成时写入的缓存值，随合并文件一起保存
+            if formula_cells:
+                cached_values[combined_ws.title] = read_cached_values(entry_file_path, formula_cells)
+            # 数据行数不含标题行和（有合计公式时的）合计行
+            total_row = entry_ws.max_row
+            has_total_row = total_row > 1 and any(cell.data_type == 'f' for cell in entry_ws[total_row])
+            merged_rows += max(0, total_row - 1 - has_total_row)
 
             # Apply styles to all rows
             for row in combined_ws.iter_rows(min_row=1, max_row=combined_ws.max_row):
@@ -589,16 +1052,24 @@ def combine_excel_files(combined_file_configs):
             combined_ws.sheet_view.showGridLines = False
             combined_ws.auto_filter.ref = combined_ws.dimensions
 
+        if not source_file_paths:
+            print(f"没有可合并的源文件，跳过合并 '{output_file_name}'")
+            continue
+
         combined_file_path = os.path.join(output_directory, output_file_name_with_date)
-        combined_wb.save(combined_file_path)
+        save_workbook(combined_wb, combined_file_path, cached_values=cached_values,
+                      compression=combined_file_config.get('compression'))
         print(f"合并的 Excel 文件已保存为 {combined_file_path}")
+        record_output(output_directory, output_file_name, None, output_file_name_with_date,
+                      date_version=date_version, rows=merged_rows)
 
-        for entry_file in include_entries:
-            file_name_with_date = entry_file.replace(".xlsx", f"@{current_date_version}.xlsx")
-            entry_file_path = os.path.join(output_directory, file_name_with_date)
+        for entry_file, entry_file_path in source_file_paths.items():
             if os.path.exists(entry_file_path):
                 os.remove(entry_file_path)
                 print(f"合并后删除源文件 '{entry_file_path}'。")
+            forget_output(output_directory, entry_file, os.path.basename(entry_file_path))
+
+        apply_retention(output_directory, output_file_name, **combined_file_config.get('retention', {}))
 
 def main_menu(config):
     """第二层菜单选择"""
@@ -610,7 +1081,7 @@ def main_menu(config):
 
             print("\n请选择要生成的 Excel 文件:")
             for i, entry in enumerate(resolved_entries, start=1):
-                print(f"{i}. {entry['excel_file_name']} (视图: '{entry['view_name']}')")
+                print(f"{i}. {get_entry_output_name(entry)} (视图: '{entry['view_name']}')")
             print("0. 全部生成")
             if combined_entries:
                 print("c. 合并特定文件")
@@ -638,7 +1109,7 @@ def main_menu(config):
                     if 1 <= choice <= len(resolved_entries):
                         try:
                             seatable_config = get_seatable_config(config)
-                            create_excel_file([resolved_entries[choice - 1]], seatable_config)
+                            create_excel_file(select_workbook_entries(resolved_entries, choice - 1), seatable_config)
                         except ValueError as e:
                             print(f"配置错误: {e}")
                     else:
@@ -650,13 +1121,83 @@ def main_menu(config):
             print("请检查配置文件中的目录引用是否正确。")
             return
 
+def run_batch_configs(config_patterns, max_workers, per_server_limit, compression=None,
+                      progress_interval=LOG_INTERVAL):
+    """批量模式：多个配置文件的条目共享一个线程池执行，最后执行各自的合并配置
+
+    执行期间每隔 progress_interval 秒输出各工作簿和整体的进度日志行。
+    """
+    config_paths = expand_config_paths(config_patterns)
+    if not config_paths:
+        print("没有找到需要执行的配置文件。")
+        return []
+
+    jobs = []
+    configs = []
+    for config_path in config_paths:
+        try:
+            config = load_and_interpolate_config(config_path)
+            if compression:
+                config['compression'] = compression
+            seatable_config = get_seatable_config(config)
+            resolved_entries = resolve_entries_with_directories(config)
+        except (OSError, ValueError) as e:
+            print(f"配置文件 '{config_path}' 加载失败，跳过: {e}")
+            continue
+        configs.append((config_path, config))
+        for group in group_entries_by_workbook(resolved_entries):
+            jobs.append((config_path, seatable_config, get_entry_output_name(group[0]), group))
+
+    print(f"批量执行 {len(configs)} 个配置文件，共 {len(jobs)} 个工作簿 "
+          f"(线程数={max_workers}, 单服务器并发={per_server_limit})")
+    started = time.perf_counter()
+    with ProgressMonitor(MODE_LOG, interval=progress_interval) as monitor:
+        # payload 为 (工作簿条目, 进度计数)
+        jobs = [(config_path, seatable_config, label, (group, track_workbook(monitor, group)))
+                for config_path, seatable_config, label, group in jobs]
+        results = run_batch(jobs, connect_base, lambda base, payload: export_workbook(base, *payload),
+                            max_workers=max_workers, per_server_limit=per_server_limit)
+
+    for config_path, config in configs:
+        if config.get('combined_files'):
+            failed_entries = {result['entry'] for result in results
+                              if result['config'] == config_path and result['status'] == 'failed'}
+            combine_excel_files(config['combined_files'], failed_entries)
+
+    print_batch_report(results, time.perf_counter() - started)
+    return results
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='SeaTable Excel 生成器')
+    parser.add_argument('--batch', nargs='+', metavar='CONFIG',
+                        help='批量模式：配置文件列表或通配符（如 "configs/*.json"），不进入交互菜单')
+    parser.add_argument('--workers', type=int, default=4, help='批量模式的线程数（默认 4）')
+    parser.add_argument('--per-server', type=int, default=2, help='批量模式下每个 SeaTable 服务器的最大并发数（默认 2）')
+    parser.add_argument('--compression', choices=list(COMPRESSION_LEVELS),
+                        help='本次运行的 XLSX 压缩级别，覆盖配置文件顶层的 compression（条目中的设置仍然优先）')
+    parser.add_argument('--progress-interval', type=float, default=LOG_INTERVAL,
+                        help=f'批量模式下输出进度日志行的间隔秒数（默认 {LOG_INTERVAL:g}）')
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+    if args.batch:
+        results = run_batch_configs(args.batch, args.workers, args.per_server, args.compression,
+                                    args.progress_interval)
+        if any(result['status'] == 'failed' for result in results):
+            exit(1)
+        return
+
     while True:
         config = load_config_file()
         if config:
+            if args.compression:
+                config['compression'] = args.compression
             main_menu(config)
         else:
             break
 
 if __name__ == '__main__':
+    # 打包为可执行文件（PyInstaller）后，工作进程需要先经过 freeze_support
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -0,0 +1,148 @@
+import pytest
+
+import mock_seatable_server
+from utils import seatable_api_helper
+from utils.seatable_api_helper import (AdaptiveLimiter, DEFAULT_BASE_DELAY, get_seatable_base, list_rows_paged,
+                                       request_with_retry)
+
+
+@pytest.fixture
+def start_server():
+    """Start mock servers for a test and shut them down afterwards."""
+    servers = []
+
+    def start(**options):
+        server, server_url = mock_seatable_server.start_server(**options)
+        servers.append(server)
+        return server, server_url
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record retry delays instead of sleeping."""
+    delays = []
+    monkeypatch.setattr(seatable_api_helper.time, 'sleep', delays.append)
+    return delays
+
+
+def connect(server_url):
+    return get_seatable_base({'server_url': server_url, 'api_token': 'test-token'})
+
+
+def rows_url(server_url):
+    return f"{server_url}/dtable-server/api/v1/dtables/{mock_seatable_server.DTABLE_UUID}/rows/"
+
+
+def auth_headers():
+    return {'Authorization': f"Token {mock_seatable_server.ACCESS_TOKEN}"}
+
+
+def expected_ids(row_count):
+    return [f"row{index:012d}" for index in range(row_count)]
+
+
+@pytest.mark.parametrize('row_count', [0, 1, 999, 1000, 1001, 5432])
+def test_list_rows_paged_returns_every_row_in_order(start_server, row_count):
+    server, server_url = start_server()
+    base = connect(server_url)
+
+    rows = list_rows_paged(base, f"表格:{row_count}", page_size=1000, limiter=AdaptiveLimiter(initial_limit=4))
+
+    assert [row['_id'] for row in rows] == expected_ids(row_count)
+
+
+@pytest.mark.parametrize('max_page_size', [1, 300, 999])
+def test_list_rows_paged_follows_server_page_cap(start_server, max_page_size):
+    server, server_url = start_server(max_page_size=max_page_size)
+    base = connect(server_url)
+
+    rows = list_rows_paged(base, '表格:2500', page_size=1000, limiter=AdaptiveLimiter(initial_limit=4))
+
+    assert [row['_id'] for row in rows] == expected_ids(2500)
+
+
+def test_list_rows_paged_retries_throttled_pages(start_server, sleeps):
+    server, server_url = start_server(seed=1)
+    base = connect(server_url)
+    server.state.throttle_rate = 0.3
+
+    rows = list_rows_paged(base, '表格:20000', page_size=1000, limiter=AdaptiveLimiter(initial_limit=8),
+                           max_retries=20)
+
+    assert [row['_id'] for row in rows] == expected_ids(20000)
+    assert server.state.stats['throttled'] > 0
+    assert len(sleeps) == server.state.stats['throttled']
+
+
+def test_list_rows_paged_reports_each_page(start_server):
+    server, server_url = start_server()
+    base = connect(server_url)
+    pages = []
+
+    rows = list_rows_paged(base, '表格:2500', page_size=1000, limiter=AdaptiveLimiter(),
+                           on_page=lambda row_count, byte_count: pages.append(row_count))
+
+    assert len(rows) == sum(pages) == 2500
+
+
+def test_request_with_retry_honours_retry_after(start_server, sleeps):
+    server, server_url = start_server(throttle_rate=1.0, retry_after=7)
+
+    response = request_with_retry('GET', rows_url(server_url), max_retries=3, params={'table_name': '表格'},
+                                  headers=auth_headers())
+
+    assert response.status_code == 429
+    assert len(sleeps) == 3
+    assert all(7 <= delay <= 7 + DEFAULT_BASE_DELAY for delay in sleeps)
+
+
+def test_request_with_retry_returns_once_throttling_stops(start_server, monkeypatch):
+    server, server_url = start_server(throttle_rate=1.0, retry_after=2)
+    sleeps = []
+
+    def stop_throttling(delay):
+        sleeps.append(delay)
+        server.state.throttle_rate = 0.0
+
+    monkeypatch.setattr(seatable_api_helper.time, 'sleep', stop_throttling)
+    response = request_with_retry('GET', rows_url(server_url), params={'table_name': '表格:3'},
+                                  headers=auth_headers())
+
+    assert response.status_code == 200
+    assert len(response.json()['rows']) == 3
+    assert len(sleeps) == 1 and sleeps[0] >= 2
+
+
+def test_adaptive_limiter_halves_on_429(start_server, sleeps):
+    server, server_url = start_server(throttle_rate=1.0, retry_after=0)
+    limiter = AdaptiveLimiter(initial_limit=8, max_limit=8)
+
+    request_with_retry('GET', rows_url(server_url), max_retries=0, limiter=limiter,
+                       params={'table_name': '表格'}, headers=auth_headers())
+    assert limiter.limit == 4
+
+    request_with_retry('GET', rows_url(server_url), max_retries=1, limiter=limiter,
+                       params={'table_name': '表格'}, headers=auth_headers())
+    assert limiter.limit == 1
+
+
+def test_adaptive_limiter_grows_only_on_success(start_server):
+    server, server_url = start_server()
+    limiter = AdaptiveLimiter(initial_limit=1, max_limit=8)
+
+    response = request_with_retry('GET', rows_url(server_url), limiter=limiter, params={'table_name': '表格:1'})
+    assert response.status_code == 401
+    response = request_with_retry('GET', f"{server_url}/missing/", limiter=limiter, headers=auth_headers())
+    assert response.status_code == 404
+    assert limiter.limit == 1
+
+    for _ in range(4):
+        response = request_with_retry('GET', rows_url(server_url), limiter=limiter, params={'table_name': '表格:1'},
+                                      headers=auth_headers())
+        assert response.status_code == 200
+    assert limiter.limit == 3
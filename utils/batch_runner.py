@@ -0,0 +1,103 @@
+import glob
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def expand_config_paths(patterns):
+    """展开配置文件列表或通配符，去重并保持顺序"""
+    config_paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        if not matches:
+            print(f"警告: 没有匹配 '{pattern}' 的配置文件")
+        for path in matches:
+            normalized = os.path.normpath(path)
+            if normalized not in config_paths:
+                config_paths.append(normalized)
+    return config_paths
+
+
+class BaseConnectionPool:
+    """按 (server_url, api_token) 缓存已认证的 Base，并按服务器限制并发数"""
+
+    def __init__(self, connect_func, per_server_limit):
+        self.connect_func = connect_func
+        self.per_server_limit = per_server_limit
+        self._lock = threading.Lock()
+        self._bases = {}
+        self._base_locks = {}
+        self._server_semaphores = {}
+
+    def server_slot(self, seatable_config):
+        """返回该服务器的并发信号量"""
+        server_url = seatable_config['server_url']
+        with self._lock:
+            if server_url not in self._server_semaphores:
+                self._server_semaphores[server_url] = threading.BoundedSemaphore(self.per_server_limit)
+            return self._server_semaphores[server_url]
+
+    def get_base(self, seatable_config):
+        """获取已认证的 Base，同一个 Base 只认证一次"""
+        key = (seatable_config['server_url'], seatable_config['api_token'])
+        with self._lock:
+            base_lock = self._base_locks.setdefault(key, threading.Lock())
+        with base_lock:
+            if key not in self._bases:
+                self._bases[key] = self.connect_func(seatable_config)
+            return self._bases[key]
+
+
+def run_batch(jobs, connect_func, export_func, max_workers=4, per_server_limit=2):
+    """在同一个线程池中执行所有配置的条目
+
+    jobs 是 (config_name, seatable_config, label, payload) 列表，payload 原样传给 export_func；
+    每个任务执行时占用所属服务器的一个并发名额，避免触发服务器限流。
+    返回每个任务的结果字典列表（与 jobs 顺序一致）。
+    """
+    pool = BaseConnectionPool(connect_func, per_server_limit)
+
+    def run_job(job):
+        config_name, seatable_config, label, payload = job
+        result = {
+            'config': config_name,
+            'entry': label,
+            'status': 'failed',
+            'rows': 0,
+            'file': None,
+        }
+        started = time.perf_counter()
+        try:
+            with pool.server_slot(seatable_config):
+                base = pool.get_base(seatable_config)
+                result.update(export_func(base, payload))
+        except Exception as e:
+            result['status'] = 'failed'
+            result['error'] = f"{type(e).__name__}: {e}"
+            print(f"错误: 配置 '{config_name}' 的 '{label}' 执行失败: {result['error']}")
+        result['seconds'] = time.perf_counter() - started
+        return result
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(run_job, jobs))
+
+
+def print_batch_report(results, total_seconds):
+    """打印批量执行的汇总报告"""
+    print("\n==================== 批量执行报告 ====================")
+    status_counts = {}
+    for result in results:
+        status_counts[result['status']] = status_counts.get(result['status'], 0) + 1
+        print(f"[{result['status']:>7}] {result['config']} / {result['entry']} "
+              f"行数={result['rows']} 耗时={result['seconds']:.2f}s")
+
+    failures = [result for result in results if result['status'] == 'failed']
+    if failures:
+        print("\n失败条目:")
+        for result in failures:
+            print(f"  {result['config']} / {result['entry']}: {result.get('error', '未知错误')}")
+
+    summary = ', '.join(f"{status}={count}" for status, count in sorted(status_counts.items()))
+    print(f"\n共 {len(results)} 个条目 ({summary})，总耗时 {total_seconds:.2f}s")
+    print("=====================================================")
@@ -0,0 +1,267 @@
+# 根据 base.list_columns 返回的列类型，为每一列预先选好处理函数和数字格式：
+# 1. 大文本、附件等列的处理函数在逐单元格清理（clean_value_for_excel）之前执行，避免多余的逐字符处理
+# 2. 日期、数字、百分比、货币等格式按列类型一次确定，不再逐个单元格猜测
+
+import time
+import threading
+from collections import namedtuple
+from utils.seatable_api_helper import list_columns_with_retry
+
+# Excel 单元格最多 32767 个字符，保持与 clean_value_for_excel 一致的上限
+MAX_CELL_LENGTH = 32000
+SUMMARY_TEXT_LENGTH = 100
+
+COLUMN_MODES = ('keep', 'skip', 'truncate', 'summarise', 'hyperlink')
+
+# 未在 column_modes 中配置时，各列类型的默认处理方式
+DEFAULT_COLUMN_MODES = {
+    'long-text': 'truncate',
+    'image': 'hyperlink',
+    'file': 'hyperlink',
+}
+
+# 列表类型列的摘要单位
+SUMMARY_UNITS = {
+    'image': '张图片',
+    'file': '个文件',
+    'link': '条记录',
+    'multiple-select': '个选项',
+    'collaborator': '人',
+}
+
+
+# 列元数据缓存：同一个表格在有效期内只请求一次 list_columns
+COLUMN_METADATA_TTL = 600
+_column_metadata_cache = {}
+_column_metadata_lock = threading.Lock()
+
+# 列格式类型
+KIND_DATE = 'date'
+KIND_NUMBER = 'number'
+KIND_INTEGER = 'integer'
+KIND_PERCENT = 'percent'
+KIND_CURRENCY = 'currency'
+KIND_TEXT = 'text'
+KIND_AUTO = 'auto'
+
+# kind 为格式类型；number_format 为数字单元格使用的 Excel 格式，None 表示保持默认
+ColumnFormat = namedtuple('ColumnFormat', ['kind', 'number_format'])
+
+CURRENCY_FORMATS = ('yuan', 'dollar', 'euro', 'custom_currency')
+DATE_TYPES = ('date', 'ctime', 'mtime')
+INTEGER_TYPES = ('rate', 'duration')
+TEXT_TYPES = (
+    'text', 'long-text', 'single-select', 'multiple-select', 'email', 'url', 'checkbox',
+    'collaborator', 'creator', 'last-modifier', 'auto-number', 'geolocation',
+    'image', 'file', 'button',
+)
+
+
+def fetch_column_metadata(base, table_name, refresh=False):
+    """获取表格的列元数据（带缓存），返回 {列名: 列定义}
+
+    遇到限流或临时性服务器错误时按指数退避重试；重试用尽或其他错误时抛出异常，
+    由调用方把条目标记为失败，而不是在没有列类型的情况下降级生成。
+    refresh 为 True 时忽略缓存重新获取（如缓存期间表格新增了列）。
+    """
+    cache_key = (getattr(base, 'dtable_uuid', None) or id(base), table_name)
+    with _column_metadata_lock:
+        cached = _column_metadata_cache.get(cache_key)
+        if cached and not refresh and time.monotonic() - cached[0] < COLUMN_METADATA_TTL:
+            return cached[1]
+
+    columns = list_columns_with_retry(base, table_name) or []
+    column_metadata = {column['name']: column for column in columns if 'name' in column}
+    with _column_metadata_lock:
+        _column_metadata_cache[cache_key] = (time.monotonic(), column_metadata)
+    return column_metadata
+
+
+def clear_column_metadata_cache():
+    """清空列元数据缓存（表结构变更后使用）"""
+    with _column_metadata_lock:
+        _column_metadata_cache.clear()
+
+
+def _decimal_format(precision, thousands=True):
+    number_format = '#,##0' if thousands else '0'
+    if precision:
+        number_format += '.' + '0' * precision
+    return number_format
+
+
+def _number_column_format(data):
+    """根据数字列（或数字结果的公式列）的 format/precision 设置确定格式"""
+    number_type = data.get('format', 'number')
+    precision = data.get('precision', 2) if data.get('enable_precision') else None
+
+    if number_type == 'percent':
+        return ColumnFormat(KIND_PERCENT, _decimal_format(2 if precision is None else precision, False) + '%')
+    if number_type in CURRENCY_FORMATS:
+        return ColumnFormat(KIND_CURRENCY, _decimal_format(2 if precision is None else precision))
+    if precision is None:
+        # 未设置精度的普通数字列仍按数值判断年份
+        return ColumnFormat(KIND_NUMBER, None)
+    if precision == 0:
+        return ColumnFormat(KIND_INTEGER, '0')
+    return ColumnFormat(KIND_NUMBER, _decimal_format(precision))
+
+
+def get_column_format(column):
+    """根据列定义确定列格式，没有元数据时返回 KIND_AUTO（按数据内容判断）"""
+    if not column:
+        return ColumnFormat(KIND_AUTO, None)
+
+    column_type = column.get('type')
+    data = column.get('data') or {}
+    if column_type == 'formula':
+        result_type = data.get('result_type')
+        if result_type == 'number':
+            return _number_column_format(data)
+        if result_type == 'date':
+            return ColumnFormat(KIND_DATE, None)
+        if result_type in ('string', 'bool'):
+            return ColumnFormat(KIND_TEXT, None)
+        return ColumnFormat(KIND_AUTO, None)
+
+    if column_type == 'number':
+        return _number_column_format(data)
+    if column_type in DATE_TYPES:
+        return ColumnFormat(KIND_DATE, None)
+    if column_type in INTEGER_TYPES:
+        return ColumnFormat(KIND_INTEGER, '0')
+    if column_type in TEXT_TYPES:
+        return ColumnFormat(KIND_TEXT, None)
+    return ColumnFormat(KIND_AUTO, None)
+
+
+def build_column_formats(seatable_fields, column_metadata):
+    """为每个字段确定列格式，与 seatable_fields 一一对应"""
+    return [get_column_format(column_metadata.get(field)) for field in seatable_fields]
+
+
+def date_part(value):
+    """日期列只保留日期部分（yyyy-mm-dd）"""
+    if isinstance(value, str):
+        return value.split('T', 1)[0]
+    return value
+
+
+def project_rows(rows, fields, defaults=None):
+    """把 list_rows 返回的行字典原地替换为按 fields 顺序排列的元组
+
+    未列出的字段（包括 _ 开头的系统字段）在这里丢弃，逐行替换使原始字典可以尽早释放；
+    defaults 为字段缺失时的取值（默认 ''），与 make_projected_rows_decoder 一致。
+    """
+    defaults = defaults or {}
+    pairs = [(field, defaults.get(field, '')) for field in fields]
+    for row_index, row in enumerate(rows):
+        rows[row_index] = tuple([row.get(field, default) for field, default in pairs])
+    return rows
+
+
+# 列内重复字符串去重：openpyxl 以内联字符串写出单元格，没有共享字符串表，
+# 但相同的值共用一个 str 对象可以减少生成期间工作表占用的内存（单选、创建者等列重复率很高）
+STRING_POOL_MAX_LENGTH = 256
+STRING_POOL_SAMPLE_SIZE = 1000
+STRING_POOL_MAX_DISTINCT_RATIO = 0.5
+
+
+def _make_string_pool():
+    pool = {}
+    seen = 0
+    enabled = True
+
+    def dedupe(value):
+        nonlocal seen, enabled
+        if not enabled or not isinstance(value, str) or len(value) > STRING_POOL_MAX_LENGTH:
+            return value
+        seen += 1
+        value = pool.setdefault(value, value)
+        # 抽样后重复率不高的列（如备注、编号）停止去重，释放字典
+        if seen == STRING_POOL_SAMPLE_SIZE and len(pool) > seen * STRING_POOL_MAX_DISTINCT_RATIO:
+            enabled = False
+            pool.clear()
+        return value
+
+    return dedupe
+
+
+def build_string_pools(column_formats):
+    """为文本类和无类型信息的列建立字符串去重函数，与 column_formats 一一对应，None 表示不去重"""
+    return [_make_string_pool() if column_format.kind in (KIND_TEXT, KIND_AUTO) else None
+            for column_format in column_formats]
+
+
+def _skip(value):
+    return ''
+
+
+def _truncate(value):
+    if isinstance(value, str) and len(value) > MAX_CELL_LENGTH:
+        return value[:MAX_CELL_LENGTH]
+    return value
+
+
+def _make_summarise(column_type):
+    unit = SUMMARY_UNITS.get(column_type, '项')
+
+    def summarise(value):
+        if isinstance(value, list):
+            return f"{len(value)} {unit}" if value else ''
+        if isinstance(value, str) and len(value) > SUMMARY_TEXT_LENGTH:
+            return value[:SUMMARY_TEXT_LENGTH] + '…'
+        return value
+
+    return summarise
+
+
+def _hyperlink(value):
+    """返回 (显示文本, URL)，没有 URL 时返回原值"""
+    if isinstance(value, list):
+        if not value:
+            return ''
+        first = value[0]
+        if isinstance(first, dict):
+            url = first.get('url')
+            text = first.get('name') or url
+        else:
+            url = text = first if isinstance(first, str) else None
+        if not url:
+            return value
+        if len(value) > 1:
+            text = f"{text} 等 {len(value)} 项"
+        return (_truncate(text), url)
+    if isinstance(value, str) and value.startswith(('http://', 'https://')):
+        return (_truncate(value), value)
+    return value
+
+
+def build_column_handlers(seatable_fields, column_metadata, column_modes=None):
+    """为每个字段选择处理函数，返回 (handlers, hyperlink_indexes)
+
+    handlers 与 seatable_fields 一一对应，None 表示不需要特殊处理；
+    hyperlink_indexes 中的列，处理函数可能返回 (显示文本, URL)。
+    """
+    column_modes = column_modes or {}
+    handlers = []
+    hyperlink_indexes = set()
+    for index, field in enumerate(seatable_fields):
+        column_type = column_metadata.get(field, {}).get('type')
+        mode = column_modes.get(field, DEFAULT_COLUMN_MODES.get(column_type, 'keep'))
+        if mode not in COLUMN_MODES:
+            print(f"警告: 列 '{field}' 的处理方式 '{mode}' 无效，可选值: {', '.join(COLUMN_MODES)}")
+            mode = 'keep'
+
+        if mode == 'skip':
+            handlers.append(_skip)
+        elif mode == 'truncate':
+            handlers.append(_truncate)
+        elif mode == 'summarise':
+            handlers.append(_make_summarise(column_type))
+        elif mode == 'hyperlink':
+            handlers.append(_hyperlink)
+            hyperlink_indexes.add(index)
+        else:
+            handlers.append(None)
+    return handlers, hyperlink_indexes
@@ -1,34 +1,86 @@
 import os
+import re
 import json
+import threading
 from dotenv import load_dotenv
 
 # 加载 .env 文件中的环境变量
 load_dotenv()
 
-def interpolate_env_vars(config):
-    """递归地替换配置中的环境变量占位符"""
+# ${VAR_NAME} 格式的环境变量占位符
+ENV_VAR_PATTERN = re.compile(r'\$\{([^}]+)\}')
+
+# 配置缓存：{绝对路径: (mtime_ns, size, 引用的环境变量及取值, 插值后的配置)}
+_config_cache = {}
+_config_cache_lock = threading.Lock()
+
+
+def interpolate_env_vars(config, referenced_vars=None):
+    """递归地替换配置中的环境变量占位符
+
+    referenced_vars 不为 None 时，记录替换过程中引用的环境变量名。
+    """
     if isinstance(config, dict):
-        return {key: interpolate_env_vars(value) for key, value in config.items()}
+        return {key: interpolate_env_vars(value, referenced_vars) for key, value in config.items()}
     elif isinstance(config, list):
-        return [interpolate_env_vars(item) for item in config]
+        return [interpolate_env_vars(item, referenced_vars) for item in config]
     elif isinstance(config, str):
+        # 不含占位符的字符串（绝大多数）不进入正则替换
+        if '${' not in config:
+            return config
+
         # 替换 ${VAR_NAME} 格式的环境变量
-        import re
-        pattern = r'\$\{([^}]+)\}'
         def replace_var(match):
             var_name = match.group(1)
+            if referenced_vars is not None:
+                referenced_vars.add(var_name)
             # 优先使用配置中的值，然后是环境变量，最后是 .env 文件中的值
             return os.environ.get(var_name, '')
-        return re.sub(pattern, replace_var, config)
+        return ENV_VAR_PATTERN.sub(replace_var, config)
     else:
         return config
 
+
+def _env_fingerprint(var_names):
+    return tuple((name, os.environ.get(name)) for name in sorted(var_names))
+
+
+def _copy_config(config):
+    """复制 JSON 配置（只含 dict/list/标量），调用方修改返回值不会影响缓存"""
+    if isinstance(config, dict):
+        return {key: _copy_config(value) for key, value in config.items()}
+    if isinstance(config, list):
+        return [_copy_config(item) for item in config]
+    return config
+
+
 def load_and_interpolate_config(config_file_path):
-    """加载并插值配置文件"""
+    """加载并插值配置文件
+
+    结果按文件的修改时间、大小以及配置引用的环境变量取值缓存，三者都未变化时直接返回缓存的副本。
+    """
+    cache_key = os.path.abspath(config_file_path)
+    stat = os.stat(config_file_path)
+    with _config_cache_lock:
+        cached = _config_cache.get(cache_key)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size \
+            and cached[2] == _env_fingerprint(var_name for var_name, _ in cached[2]):
+        return _copy_config(cached[3])
+
     with open(config_file_path, 'r', encoding='utf-8') as f:
         config = json.load(f)
-    
+
     # 插值环境变量
-    interpolated_config = interpolate_env_vars(config)
-    
-    return interpolated_config
\ No newline at end of file
+    referenced_vars = set()
+    interpolated_config = interpolate_env_vars(config, referenced_vars)
+
+    with _config_cache_lock:
+        _config_cache[cache_key] = (stat.st_mtime_ns, stat.st_size, _env_fingerprint(referenced_vars),
+                                    interpolated_config)
+    return _copy_config(interpolated_config)
+
+
+def clear_config_cache():
+    """清空配置缓存"""
+    with _config_cache_lock:
+        _config_cache.clear()
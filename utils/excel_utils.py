@@ -1,21 +1,48 @@
 import os
+import re
+import json
+import datetime
+import uuid
+from contextlib import contextmanager
+from zipfile import ZipFile, ZIP_DEFLATED, ZIP_STORED
+from openpyxl import load_workbook
 from openpyxl.styles import Font, Alignment, Border, Side, PatternFill, NamedStyle
-from openpyxl.utils import get_column_letter
+from openpyxl.utils import get_column_letter, column_index_from_string
+from openpyxl.utils.cell import coordinate_from_string
+from openpyxl.writer.excel import ExcelWriter
 
 # Border and style settings
 thin_border = Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin'))
 currency_format = NamedStyle(name='currency_format')
 currency_format.number_format = '#,##0.00'  # Set number format to currency without symbol, two decimal places
 
+# Shared style objects, built once instead of per cell
+center_alignment = Alignment(horizontal='center', vertical='center')
+header_font = Font(bold=True, color="000000", name="阿里巴巴普惠体 3.0 55 Regular")  # Black font with Alibaba PuHuiTi font
+body_font = Font(name="阿里巴巴普惠体 3.0 55 Regular")  # Set Alibaba PuHuiTi font for non-header cells
+header_fill = PatternFill("solid", fgColor="ADD8E6")  # Light blue background
+
+TOTALS_SIDECAR_SUFFIX = '.totals.json'
+TOTALS_SUMMARY_SHEET_TITLE = '合计汇总'
+
+# XLSX compression presets: name -> (zip method, zlib level); None keeps zlib's default (6)
+COMPRESSION_LEVELS = {
+    'store': (ZIP_STORED, None),
+    'fast': (ZIP_DEFLATED, 1),
+    'default': (ZIP_DEFLATED, None),
+    'max': (ZIP_DEFLATED, 9),
+}
+DEFAULT_COMPRESSION = 'default'
+
 def apply_styles(cell, is_header=False):
     """Apply styles to the cell."""
     cell.border = thin_border
-    cell.alignment = Alignment(horizontal='center', vertical='center')
+    cell.alignment = center_alignment
     if is_header:
-        cell.font = Font(bold=True, color="000000", name="阿里巴巴普惠体 3.0 55 Regular")  # Black font with Alibaba PuHuiTi font
-        cell.fill = PatternFill("solid", fgColor="ADD8E6")  # Light blue background
+        cell.font = header_font
+        cell.fill = header_fill
     else:
-        cell.font = Font(name="阿里巴巴普惠体 3.0 55 Regular")  # Set Alibaba PuHuiTi font for non-header cells
+        cell.font = body_font
         cell.number_format = '#,##0.00'
 
 def adjust_column_width(ws):
@@ -25,10 +52,152 @@ def adjust_column_width(ws):
         adjusted_width = (max_length + 2) * 1.8
         ws.column_dimensions[get_column_letter(col[0].column)].width = adjusted_width
 
-def save_excel_file(wb, directory, file_name):
+# A formula cell as written by openpyxl: <c r="B10" ...><f>...</f><v/>
+_FORMULA_CELL_PATTERN = re.compile(rb'(<c r="([A-Z]+[0-9]+)"[^>]*><f>[^<]*</f>)<v(?:\s*/>|></v>)')
+
+def fill_cached_values(xml, values):
+    """Fill the empty <v/> of the given formula cells in worksheet XML.
+
+    values maps coordinate -> value. One pass over the XML covers every
+    coordinate, rather than one regex scan per formula cell.
+    """
+    cached = {coordinate.encode('ascii'): str(value).encode('ascii') for coordinate, value in values.items()}
+
+    def fill_value(match):
+        value = cached.get(match.group(2))
+        if value is None:
+            return match.group(0)
+        return match.group(1) + b'<v>' + value + b'</v>'
+
+    return _FORMULA_CELL_PATTERN.sub(fill_value, xml)
+
+def read_cached_values(file_path, coordinates):
+    """Read the cached values of formula cells on the active sheet of a saved workbook.
+
+    Returns {coordinate: value} for the given coordinates that have a cached
+    value. The sheet is streamed once from the first requested row onwards.
+    """
+    wanted = {}
+    for coordinate in coordinates:
+        column, row = coordinate_from_string(coordinate)
+        wanted.setdefault(row, {})[column_index_from_string(column)] = coordinate
+    if not wanted:
+        return {}
+    values = {}
+    first_row, last_row = min(wanted), max(wanted)
+    wb = load_workbook(filename=file_path, read_only=True, data_only=True)
+    try:
+        for row_number, row in enumerate(wb.active.iter_rows(min_row=first_row, values_only=True), first_row):
+            for column_index, coordinate in wanted.get(row_number, {}).items():
+                if column_index <= len(row) and row[column_index - 1] is not None:
+                    values[coordinate] = row[column_index - 1]
+            if row_number >= last_row:
+                break
+    finally:
+        wb.close()
+    return values
+
+class _CachedValueZipFile(ZipFile):
+    """ZipFile that fills in cached formula values while worksheet XML is archived.
+
+    openpyxl writes formula cells as <f>...</f><v/>; the empty <v/> is replaced
+    with the supplied value so readers that don't recalculate still see it.
+    """
+
+    def __init__(self, *args, sheet_values=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sheet_values = sheet_values or {}
+
+    def write(self, filename, arcname=None, *args, **kwargs):
+        values = self.sheet_values.get(arcname)
+        if not values:
+            return super().write(filename, arcname, *args, **kwargs)
+        with open(filename, 'rb') as f:
+            xml = f.read()
+        self.writestr(arcname, fill_cached_values(xml, values))
+
+def get_zip_options(compression=None):
+    """Return (zip method, compress level) for a compression preset name."""
+    compression = compression or DEFAULT_COMPRESSION
+    if compression not in COMPRESSION_LEVELS:
+        raise ValueError(f"Unknown compression '{compression}', choose from: {', '.join(COMPRESSION_LEVELS)}")
+    return COMPRESSION_LEVELS[compression]
+
+@contextmanager
+def replace_file(file_path):
+    """Yield a temporary path next to file_path and move it into place on success.
+
+    The target is replaced rather than rewritten, so an unchanged output that was
+    hard-linked to an earlier dated file never changes that file's contents.
+    """
+    directory, name = os.path.split(os.path.abspath(file_path))
+    temp_path = os.path.join(directory, f".{name}.{uuid.uuid4().hex}.tmp")
+    try:
+        yield temp_path
+        os.replace(temp_path, file_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def save_workbook(wb, file_path, cached_values=None, compression=None):
+    """Save the workbook, writing cached values for the given formula cells.
+
+    cached_values maps sheet title -> {coordinate: value}.
+    compression is a COMPRESSION_LEVELS preset: 'store' skips deflate entirely
+    (fastest save, largest file), 'max' trades save time for size.
+    """
+    zip_method, compress_level = get_zip_options(compression)
+    sheet_values = {}
+    if cached_values:
+        # openpyxl numbers worksheet parts by their position in the workbook
+        for idx, ws in enumerate(wb.worksheets, 1):
+            if cached_values.get(ws.title):
+                sheet_values[f"xl/worksheets/sheet{idx}.xml"] = cached_values[ws.title]
+    wb.properties.modified = datetime.datetime.now(tz=datetime.timezone.utc).replace(tzinfo=None)
+    with replace_file(file_path) as temp_path:
+        archive = _CachedValueZipFile(temp_path, 'w', zip_method, allowZip64=True, compresslevel=compress_level,
+                                      sheet_values=sheet_values)
+        ExcelWriter(wb, archive).save()
+
+def save_excel_file(wb, directory, file_name, cached_values=None, compression=None):
     """Save the Excel workbook to the specified directory."""
     if not os.path.exists(directory):
         os.makedirs(directory)
     excel_file_path = os.path.join(directory, file_name)
-    wb.save(excel_file_path)
+    save_workbook(wb, excel_file_path, cached_values=cached_values, compression=compression)
     print(f"Excel file '{file_name}' created successfully in '{directory}'.")
+
+def build_totals_summary(sheet_name, row_count, sum_column_indexes, totals, counts):
+    """Build the per-column totals summary (sums kept as exact decimal strings)."""
+    return {
+        'sheet': sheet_name,
+        'rows': row_count,
+        'columns': {
+            column: {'sum': str(totals[index]), 'count': counts[index]}
+            for index, column in sum_column_indexes.items()
+        },
+    }
+
+def add_totals_summary_sheet(wb, summaries):
+    """Append a sheet listing each sheet's sum column totals and value counts."""
+    ws = wb.create_sheet(title=TOTALS_SUMMARY_SHEET_TITLE)
+    ws.append(['工作表', '列名', '合计', '数量'])
+    for summary in summaries:
+        for column, column_summary in summary['columns'].items():
+            ws.append([summary['sheet'], column, float(column_summary['sum']), column_summary['count']])
+    for row in ws.iter_rows(min_row=1, max_row=ws.max_row):
+        for cell in row:
+            apply_styles(cell, is_header=cell.row == 1)
+            if cell.column == 4 and cell.row > 1:
+                cell.number_format = '0'
+    adjust_column_width(ws)
+    ws.sheet_view.showGridLines = False
+    return ws
+
+def write_totals_sidecar(excel_file_path, summaries):
+    """Write the per-sheet totals summaries as JSON next to the Excel file."""
+    sidecar_path = excel_file_path + TOTALS_SIDECAR_SUFFIX
+    with replace_file(sidecar_path) as temp_path:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'file': os.path.basename(excel_file_path), 'sheets': summaries}, f, ensure_ascii=False, indent=2)
+    return sidecar_path
@@ -0,0 +1,114 @@
+import sys
+import queue
+import traceback
+import multiprocessing
+
+try:
+    import resource  # 仅 POSIX 系统提供，Windows 上不限制内存
+except ImportError:
+    resource = None
+
+# 工作进程统一使用 spawn 启动：批量模式下是在线程池中启动进程，fork 多线程进程可能继承被其他线程持有的锁；
+# spawn 在 Windows、macOS 上也是默认方式，各平台行为一致
+_context = multiprocessing.get_context('spawn')
+
+
+def set_memory_limit(memory_mb):
+    """用 RLIMIT_AS 限制当前进程的地址空间，返回是否生效（Windows 或未设置时返回 False）"""
+    if resource is None or not memory_mb:
+        return False
+    limit = int(memory_mb * 1024 * 1024)
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+    return True
+
+
+class _QueueWriter:
+    """替换工作进程的 sys.stdout，把输出按行发送给父进程"""
+
+    def __init__(self, message_queue):
+        self.message_queue = message_queue
+        self.buffer = ''
+
+    def write(self, text):
+        self.buffer += text
+        while '\n' in self.buffer:
+            line, self.buffer = self.buffer.split('\n', 1)
+            self.message_queue.put(('output', line))
+        return len(text)
+
+    def flush(self):
+        if self.buffer:
+            self.message_queue.put(('output', self.buffer))
+            self.buffer = ''
+
+
+def _is_memory_limit_error(error):
+    """是否为超过内存限制导致的异常：内存分配失败，或地址空间不足以分配新线程的栈"""
+    if isinstance(error, MemoryError):
+        return True
+    return isinstance(error, RuntimeError) and "can't start new thread" in str(error)
+
+
+def _worker_main(message_queue, memory_mb, func, args):
+    """工作进程入口：限制内存后执行 func(*args)，把输出和结果通过队列发回父进程"""
+    writer = _QueueWriter(message_queue)
+    sys.stdout = writer
+    # 先发送一条消息，让队列的后台发送线程在限制内存之前启动，否则超限后无法再创建线程报告错误
+    message_queue.put(('started', None))
+    result = error = None
+    try:
+        set_memory_limit(memory_mb)
+        result = func(*args)
+    except BaseException as e:
+        if memory_mb and _is_memory_limit_error(e):
+            error = f"内存超过工作进程限制 ({memory_mb} MB)"
+        else:
+            error = f"{type(e).__name__}: {e}\n{traceback.format_exc()}"
+    # 离开 except 后异常的回溯及其引用的数据（如未写完的工作簿）才会释放，超过内存限制时之后才能发送消息
+    writer.flush()
+    if error is None:
+        message_queue.put(('result', result))
+    else:
+        message_queue.put(('error', error))
+
+
+def run_isolated(func, args, label, memory_mb=None, poll_interval=0.5):
+    """在独立的工作进程中执行 func(*args)，返回 (结果, 错误信息)
+
+    工作进程的输出逐行转发到父进程（带 [label] 前缀）；工作进程抛出异常、超过内存限制
+    或被系统终止（如 OOM）时返回 (None, 错误信息)，不影响父进程和其他条目。
+    func 和 args 需要可以被 pickle（模块级函数和普通数据）。
+    """
+    message_queue = _context.Queue()
+    process = _context.Process(target=_worker_main, args=(message_queue, memory_mb, func, args), daemon=True)
+    process.start()
+
+    result = None
+    error = None
+    while True:
+        try:
+            kind, payload = message_queue.get(timeout=poll_interval)
+        except queue.Empty:
+            if process.is_alive():
+                continue
+            # 进程已退出：取完队列中剩余的消息后结束
+            try:
+                kind, payload = message_queue.get(timeout=poll_interval)
+            except queue.Empty:
+                break
+        if kind == 'output':
+            print(f"[{label}] {payload}")
+        elif kind == 'result':
+            result = payload
+        elif kind == 'error':
+            error = payload
+
+    process.join()
+    if result is None and error is None:
+        error = f"工作进程异常退出（退出码 {process.exitcode}）"
+        if process.exitcode is not None and process.exitcode < 0:
+            error += "，可能因内存不足被系统终止"
+    return result, error
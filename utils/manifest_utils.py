@@ -0,0 +1,346 @@
+import os
+import json
+import shutil
+import hashlib
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from utils.excel_utils import TOTALS_SIDECAR_SUFFIX, replace_file
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# 清单文件名，保存在每个输出目录下；记录每个条目生成过的所有文件（输出索引）
+MANIFEST_FILE_NAME = '.export_manifest.json'
+MANIFEST_VERSION = 2
+MANIFEST_LOCK_SUFFIX = '.lock'
+
+# 样式版本号：修改 excel_utils 中的样式或格式逻辑时需要递增，使旧指纹失效
+STYLE_VERSION = 5
+
+# 批量模式下多个线程可能同时读写同一目录的清单
+_manifest_lock = threading.RLock()
+# 当前持有锁文件的目录及嵌套次数（由 _manifest_lock 保护）
+_locked_directories = {}
+
+
+def _lock_file(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        return
+    f.seek(0)
+    while True:
+        try:
+            # LK_LOCK 重试约 10 秒后仍未获得锁时抛出 OSError，继续等待
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            continue
+
+
+def _unlock_file(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def manifest_lock(directory):
+    """修改清单期间持有的锁
+
+    同一进程内的线程由 _manifest_lock 串行；独立工作进程和同时运行的其他批量任务
+    由输出目录下的 .export_manifest.json.lock 锁文件串行。可以嵌套使用。
+    """
+    directory = os.path.abspath(directory)
+    with _manifest_lock:
+        if directory in _locked_directories:
+            _locked_directories[directory] += 1
+            try:
+                yield
+            finally:
+                _locked_directories[directory] -= 1
+            return
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, MANIFEST_FILE_NAME + MANIFEST_LOCK_SUFFIX), 'a+b') as lock_file:
+            _lock_file(lock_file)
+            _locked_directories[directory] = 1
+            try:
+                yield
+            finally:
+                del _locked_directories[directory]
+                _unlock_file(lock_file)
+
+
+def start_entry_fingerprint(entry, field_mapping, column_metadata=None):
+    """开始计算条目的内容指纹（行数据 + 字段映射 + 列类型 + 合计列 + 样式版本），返回哈希对象
+
+    行数据通过 update_entry_fingerprint 按视图顺序逐行加入；哈希的是 _id 以及映射字段的值，
+    而不是只看 _mtime，因为公式列和链接列的结果变化不会更新行的 _mtime。
+    column_metadata 为 {列名: 列定义}，映射字段的类型和类型设置（精度、货币、百分比等）决定数字格式
+    和大文本、附件列的默认处理方式，只修改列类型而不修改数据时也需要重新生成。
+    """
+    column_metadata = column_metadata or {}
+    column_types = {
+        field: [column_metadata[field].get('type'), column_metadata[field].get('data')]
+        for field in field_mapping if field in column_metadata
+    }
+    hasher = hashlib.sha256()
+    config_part = {
+        'field_mapping': field_mapping,
+        'sum_columns': entry.get('sum_columns', []),
+        'sheet_name': entry.get('sheet_name', entry.get('view_name')),
+        'totals_summary': entry.get('totals_summary'),
+        'column_modes': entry.get('column_modes'),
+        'column_types': column_types,
+        'compression': entry.get('compression'),
+        'style_version': STYLE_VERSION,
+    }
+    hasher.update(json.dumps(config_part, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8'))
+    return hasher
+
+
+def update_entry_fingerprint(hasher, row_id, values):
+    """把一行（_id 和按字段顺序排列的值）加入指纹"""
+    hasher.update(repr((row_id, values)).encode('utf-8'))
+    hasher.update(b'\x1e')
+
+
+def combine_fingerprints(fingerprints):
+    """多个条目写入同一个工作簿时，按工作表顺序合并各条目的指纹"""
+    hasher = hashlib.sha256()
+    for fingerprint in fingerprints:
+        hasher.update(fingerprint.encode('ascii'))
+    return hasher.hexdigest()
+
+
+def _empty_manifest():
+    return {'version': MANIFEST_VERSION, 'entries': {}}
+
+
+def load_manifest(directory):
+    """读取输出目录下的清单文件，不存在或损坏时返回空清单"""
+    manifest_path = os.path.join(directory, MANIFEST_FILE_NAME)
+    if not os.path.exists(manifest_path):
+        return _empty_manifest()
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (ValueError, OSError) as e:
+        print(f"警告: 清单文件 '{manifest_path}' 读取失败，将重新生成: {e}")
+        return _empty_manifest()
+
+    if 'entries' not in manifest:
+        # 旧版清单：{条目: {fingerprint, file_name, updated}}，只保留最新文件的信息
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'entries': {
+                file_key: {
+                    'fingerprint': record.get('fingerprint'),
+                    'latest': record.get('file_name'),
+                    'updated': record.get('updated'),
+                    'history': [{'file_name': record.get('file_name'), 'created': record.get('updated')}],
+                }
+                for file_key, record in manifest.items() if isinstance(record, dict)
+            },
+        }
+    return manifest
+
+
+def save_manifest(directory, manifest):
+    """写入清单文件（先写临时文件再替换，避免中断时损坏；调用方需持有 manifest_lock）"""
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+    with replace_file(os.path.join(directory, MANIFEST_FILE_NAME)) as temp_path:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+
+def hash_file(file_path):
+    """计算文件的 SHA-256"""
+    hasher = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def get_latest_output(directory, file_key):
+    """返回条目最近一次输出的记录（含 file_name、date_version、rows、size、sha256），没有时返回 None"""
+    with _manifest_lock:
+        record = load_manifest(directory)['entries'].get(file_key)
+    if not record or not record.get('latest'):
+        return None
+    for item in reversed(record.get('history', [])):
+        if item.get('file_name') == record['latest']:
+            return item
+    return {'file_name': record['latest']}
+
+
+def get_last_row_count(directory, file_key):
+    """返回条目最近一次输出的行数
+
+    输出文件已被移除（如合并后删除源文件）时，返回移除前记录的 last_rows；都没有时返回 None。
+    """
+    with _manifest_lock:
+        record = load_manifest(directory)['entries'].get(file_key)
+    if not record:
+        return None
+    latest = get_latest_output(directory, file_key)
+    if latest and latest.get('rows') is not None:
+        return latest['rows']
+    return record.get('last_rows')
+
+
+def get_latest_output_path(directory, file_key):
+    """返回条目最近一次输出且仍然存在的文件路径，没有时返回 None"""
+    latest = get_latest_output(directory, file_key)
+    if not latest:
+        return None
+    file_path = os.path.join(directory, latest['file_name'])
+    return file_path if os.path.exists(file_path) else None
+
+
+def reuse_unchanged_output(directory, file_key, fingerprint, target_file_name, date_version=None):
+    """如果指纹与上次一致且上次的文件仍存在，则复用上次的输出
+
+    优先使用硬链接，跨文件系统等情况下回退为复制；之后重新生成该文件时，
+    excel_utils 会写入临时文件再替换（replace_file），不会改动链接到的旧文件。
+    返回 True 表示已复用，无需重新生成。
+    """
+    with manifest_lock(directory):
+        return _reuse_unchanged_output(directory, file_key, fingerprint, target_file_name, date_version)
+
+
+def _reuse_unchanged_output(directory, file_key, fingerprint, target_file_name, date_version):
+    record = load_manifest(directory)['entries'].get(file_key)
+    if not record or record.get('fingerprint') != fingerprint or not record.get('latest'):
+        return False
+
+    previous_path = os.path.join(directory, record['latest'])
+    target_path = os.path.join(directory, target_file_name)
+    if not os.path.exists(previous_path):
+        return False
+
+    if os.path.abspath(previous_path) != os.path.abspath(target_path):
+        _link_or_copy(previous_path, target_path)
+        # 合计汇总 JSON 与工作簿一起复用
+        if os.path.exists(previous_path + TOTALS_SIDECAR_SUFFIX):
+            _link_or_copy(previous_path + TOTALS_SIDECAR_SUFFIX, target_path + TOTALS_SIDECAR_SUFFIX)
+
+    # 内容相同，沿用上次记录的行数和哈希，不再重新计算
+    previous = get_latest_output(directory, file_key) or {}
+    record_output(directory, file_key, fingerprint, target_file_name, date_version=date_version,
+                  rows=previous.get('rows'), sha256=previous.get('sha256'))
+    return True
+
+
+def _link_or_copy(source_path, target_path):
+    if os.path.exists(target_path):
+        os.remove(target_path)
+    try:
+        os.link(source_path, target_path)
+    except OSError:
+        shutil.copy2(source_path, target_path)
+
+
+def record_output(directory, file_key, fingerprint, file_name, date_version=None, rows=None, sha256=None):
+    """在清单中记录一次输出：条目、日期版本、行数、文件大小和哈希，并更新条目的最新文件"""
+    file_path = os.path.join(directory, file_name)
+    item = {
+        'file_name': file_name,
+        'date_version': date_version,
+        'rows': rows,
+        'size': os.path.getsize(file_path) if os.path.exists(file_path) else None,
+        'sha256': sha256 or (hash_file(file_path) if os.path.exists(file_path) else None),
+        'created': datetime.now().isoformat(timespec='seconds'),
+    }
+    with manifest_lock(directory):
+        manifest = load_manifest(directory)
+        record = manifest['entries'].setdefault(file_key, {'history': []})
+        # 同一天重复生成时替换当天的记录
+        record['history'] = [old for old in record.get('history', []) if old.get('file_name') != file_name]
+        record['history'].append(item)
+        record['fingerprint'] = fingerprint
+        record['latest'] = file_name
+        record['updated'] = item['created']
+        if rows is not None:
+            record['last_rows'] = rows
+        save_manifest(directory, manifest)
+
+
+def forget_output(directory, file_key, file_name):
+    """文件被删除（如合并后删除源文件）时，从清单中移除对应记录
+
+    条目的 last_rows 保留，供判断是否隔离生成和估算进度使用。
+    """
+    with manifest_lock(directory):
+        manifest = load_manifest(directory)
+        record = manifest['entries'].get(file_key)
+        if not record:
+            return
+        # 旧版清单没有 last_rows，移除最新文件前从它的记录中补上
+        forgotten = next((item for item in record.get('history', []) if item.get('file_name') == file_name), None)
+        if record.get('latest') == file_name and forgotten and forgotten.get('rows') is not None:
+            record['last_rows'] = forgotten['rows']
+        record['history'] = [item for item in record.get('history', []) if item.get('file_name') != file_name]
+        if record.get('latest') == file_name:
+            record['latest'] = record['history'][-1]['file_name'] if record['history'] else None
+            record['fingerprint'] = None
+        save_manifest(directory, manifest)
+
+
+RETENTION_KEYS = ('keep', 'keep_days')
+
+
+def validate_retention(retention):
+    """检查保留策略配置，无效时抛出 ValueError（在生成前报错，而不是写完文件后才失败）"""
+    if not isinstance(retention, dict):
+        raise ValueError(f"retention 应为对象，如 {{\"keep\": 7, \"keep_days\": 30}}，实际为: {retention!r}")
+    unknown_keys = [key for key in retention if key not in RETENTION_KEYS]
+    if unknown_keys:
+        raise ValueError(f"retention 中有未知的设置 {unknown_keys}，可选: {', '.join(RETENTION_KEYS)}")
+    for key, value in retention.items():
+        if value is not None and (isinstance(value, bool) or not isinstance(value, int) or value < 0):
+            raise ValueError(f"retention 的 {key} 应为非负整数，实际为: {value!r}")
+
+
+def apply_retention(directory, file_key, keep=None, keep_days=None):
+    """按保留策略删除条目的历史输出文件，返回删除的文件名列表
+
+    keep: 最多保留最近 N 个版本；keep_days: 只保留最近 N 天内生成的版本。
+    最新的版本始终保留。
+    """
+    if keep is None and keep_days is None:
+        return []
+    removed = []
+    with manifest_lock(directory):
+        manifest = load_manifest(directory)
+        record = manifest['entries'].get(file_key)
+        if not record:
+            return []
+        history = record.get('history', [])
+        cutoff = datetime.now() - timedelta(days=keep_days) if keep_days is not None else None
+        kept = []
+        for position, item in enumerate(reversed(history)):
+            is_latest = item.get('file_name') == record.get('latest')
+            too_many = keep is not None and position >= max(keep, 1)
+            too_old = cutoff is not None and item.get('created') and datetime.fromisoformat(item['created']) < cutoff
+            if not is_latest and (too_many or too_old):
+                for path in (os.path.join(directory, item['file_name']),
+                             os.path.join(directory, item['file_name'] + TOTALS_SIDECAR_SUFFIX)):
+                    if os.path.exists(path):
+                        os.remove(path)
+                removed.append(item['file_name'])
+            else:
+                kept.append(item)
+        record['history'] = list(reversed(kept))
+        if removed:
+            save_manifest(directory, manifest)
+    for file_name in removed:
+        print(f"按保留策略删除历史文件 '{os.path.join(directory, file_name)}'。")
+    return removed
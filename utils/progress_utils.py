@@ -0,0 +1,310 @@
+import sys
+import time
+import threading
+import unicodedata
+from datetime import datetime
+
+# 进度阶段
+PHASE_PENDING = 'pending'
+PHASE_FETCH = 'fetch'
+PHASE_WRITE = 'write'
+PHASE_FORMAT = 'format'
+PHASE_SAVE = 'save'
+PHASE_ISOLATED = 'isolated'
+PHASE_DONE = 'done'
+PHASE_LABELS = {
+    PHASE_PENDING: '等待',
+    PHASE_FETCH: '获取',
+    PHASE_WRITE: '写入',
+    PHASE_FORMAT: '设置格式',
+    PHASE_SAVE: '保存',
+    PHASE_ISOLATED: '工作进程',
+    PHASE_DONE: '完成',
+}
+
+# 写入和设置格式时每累计这么多行才更新一次计数，避免逐行（逐单元格）更新
+PROGRESS_BATCH_ROWS = 1000
+
+# 显示方式：bar 为交互窗口中的单行进度条，log 为定期输出的结构化日志行
+MODE_BAR = 'bar'
+MODE_LOG = 'log'
+BAR_INTERVAL = 0.5
+LOG_INTERVAL = 10.0
+BAR_WIDTH = 20
+WORK_UNITS_PER_ROW = 3
+
+
+def _format_eta(seconds):
+    if seconds is None:
+        return '--:--'
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+
+def _display_width(text):
+    """终端显示宽度（中文等全角字符占两列）"""
+    return sum(2 if unicodedata.east_asian_width(char) in ('W', 'F') else 1 for char in text)
+
+
+class ExportProgress:
+    """单个工作簿的进度计数
+
+    计数由导出流程按页（获取）或按 PROGRESS_BATCH_ROWS 行（写入、设置格式）批量累加；
+    expected_rows 为预计行数（如输出索引中上次的行数），获取完成后以实际行数为准。
+    """
+    PHASE_COUNTERS = {PHASE_FETCH: 'rows_fetched', PHASE_WRITE: 'rows_written', PHASE_FORMAT: 'rows_formatted'}
+
+    def __init__(self, name, expected_rows=None):
+        self.name = name
+        self.expected_rows = expected_rows
+        self.total_rows = None
+        self.rows_fetched = 0
+        self.rows_written = 0
+        self.rows_formatted = 0
+        self.bytes_fetched = 0
+        self.phase = PHASE_PENDING
+        self.phase_started = None
+        self.phase_base = 0
+        self.status = None
+
+    def start_phase(self, phase, total_rows=None):
+        """进入新阶段；共享工作簿的各工作表会交替进入写入和设置格式阶段，速度按本阶段新增的行数计算"""
+        self.phase = phase
+        self.phase_started = time.monotonic()
+        self.phase_base = self._phase_done()
+        if total_rows is not None:
+            self.total_rows = total_rows
+
+    def _phase_done(self):
+        counter = self.PHASE_COUNTERS.get(self.phase)
+        return getattr(self, counter) if counter else 0
+
+    def add_fetched(self, rows, byte_count=0):
+        if self.phase != PHASE_FETCH:
+            self.start_phase(PHASE_FETCH)
+        self.rows_fetched += rows
+        self.bytes_fetched += byte_count
+
+    def add_written(self, rows):
+        self.rows_written += rows
+
+    def add_formatted(self, rows):
+        self.rows_formatted += rows
+
+    def finish(self, status, rows=None):
+        if rows is not None:
+            self.total_rows = rows
+        self.status = status
+        self.start_phase(PHASE_DONE)
+
+    @property
+    def finished(self):
+        return self.phase == PHASE_DONE
+
+    def phase_rate(self):
+        """当前阶段的速度（行/秒）"""
+        if self.phase_started is None:
+            return 0.0
+        elapsed = time.monotonic() - self.phase_started
+        done = self._phase_done() - self.phase_base
+        return done / elapsed if elapsed > 0 else 0.0
+
+    def phase_counts(self):
+        """当前阶段的 (已完成行数, 总行数)，总行数未知时为 None"""
+        if self.phase == PHASE_FETCH:
+            return self.rows_fetched, self.expected_rows
+        if self.phase == PHASE_FORMAT:
+            return self.rows_formatted, self.total_rows
+        return self.rows_written, self.total_rows
+
+    def phase_eta(self):
+        done, total = self.phase_counts()
+        rate = self.phase_rate()
+        if total is None or rate <= 0 or self.phase not in self.PHASE_COUNTERS:
+            return None
+        return max(0, total - done) / rate
+
+    def work(self):
+        """整体工作量 (已完成, 总量)：每行的获取、写入和设置格式各算一个单位，总量未知时为 None"""
+        if self.finished:
+            units = WORK_UNITS_PER_ROW * (self.total_rows or 0)
+            return units, units
+        rows = self.total_rows if self.total_rows is not None else self.expected_rows
+        done = self.rows_fetched + self.rows_written + self.rows_formatted
+        if rows is None:
+            return done, None
+        return min(done, WORK_UNITS_PER_ROW * rows), WORK_UNITS_PER_ROW * rows
+
+    def fraction(self):
+        """完成比例，总量未知时按 0 计"""
+        if self.finished:
+            return 1.0
+        done, total = self.work()
+        return done / total if total else 0.0
+
+
+class _BarStream:
+    """进度条显示期间替换 sys.stdout：输出其他内容前先清除进度条所在行"""
+
+    def __init__(self, monitor, stream):
+        self.monitor = monitor
+        self.stream = stream
+
+    def write(self, text):
+        with self.monitor.lock:
+            self.monitor.clear_bar()
+            if text:
+                # print 分两次写入内容和换行，未写完的行上不绘制进度条
+                self.monitor.line_open = not text.endswith('\n')
+            return self.stream.write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+    def isatty(self):
+        return self.stream.isatty()
+
+
+class ProgressMonitor:
+    """汇总多个工作簿的进度，并在后台线程中定期显示
+
+    with ProgressMonitor(MODE_BAR) as monitor:
+        progress = monitor.track('报表.xlsx', expected_rows=10000)
+    """
+
+    def __init__(self, mode=None, interval=None, stream=None):
+        self.stream = stream or sys.stdout
+        if mode is None:
+            mode = MODE_BAR if getattr(self.stream, 'isatty', lambda: False)() else MODE_LOG
+        self.mode = mode
+        self.interval = interval or (BAR_INTERVAL if mode == MODE_BAR else LOG_INTERVAL)
+        self.trackers = []
+        self.lock = threading.RLock()
+        self.started = None
+        self.bar_width = 0
+        self.line_open = False
+        self._stop = threading.Event()
+        self._thread = None
+        self._original_stdout = None
+
+    def track(self, name, expected_rows=None):
+        progress = ExportProgress(name, expected_rows)
+        with self.lock:
+            self.trackers.append(progress)
+        return progress
+
+    def __enter__(self):
+        self.started = time.monotonic()
+        if self.mode == MODE_BAR and self.stream is sys.stdout:
+            self._original_stdout = sys.stdout
+            sys.stdout = _BarStream(self, self.stream)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+        self.render()
+        with self.lock:
+            if self.mode == MODE_BAR and self.bar_width:
+                self.stream.write('\n')
+                self.bar_width = 0
+            self.stream.flush()
+        if self._original_stdout is not None:
+            sys.stdout = self._original_stdout
+        return False
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.render()
+
+    def overall(self):
+        """整体进度：(已完成工作簿数, 工作簿数, 完成比例或 None, 行/秒, 获取字节数, 预计剩余秒数或 None)
+
+        所有工作簿的行数都已知（或可按上次的行数预计）时按行计算比例和剩余时间，
+        否则比例为各工作簿完成比例的平均值，不估算剩余时间。
+        """
+        with self.lock:
+            trackers = list(self.trackers)
+        finished = sum(1 for progress in trackers if progress.finished)
+        done_units = 0
+        total_units = 0
+        known = True
+        for progress in trackers:
+            done, total = progress.work()
+            done_units += done
+            if total is None:
+                known = False
+            else:
+                total_units += total
+        elapsed = time.monotonic() - self.started if self.started else 0
+        rate = done_units / WORK_UNITS_PER_ROW / elapsed if elapsed > 0 else 0.0
+        if known and total_units:
+            fraction = done_units / total_units
+        elif trackers:
+            fraction = sum(progress.fraction() for progress in trackers) / len(trackers)
+        else:
+            fraction = None
+        eta = (total_units - done_units) / WORK_UNITS_PER_ROW / rate if known and rate > 0 else None
+        byte_count = sum(progress.bytes_fetched for progress in trackers)
+        return finished, len(trackers), fraction, rate, byte_count, eta
+
+    def render(self):
+        if self.mode == MODE_BAR:
+            self._render_bar()
+        else:
+            self._render_log()
+
+    def _render_bar(self):
+        finished, count, fraction, rate, byte_count, eta = self.overall()
+        with self.lock:
+            active = [progress for progress in self.trackers if progress.phase not in (PHASE_PENDING, PHASE_DONE)]
+        filled = int(BAR_WIDTH * fraction) if fraction is not None else 0
+        line = f"[{'#' * filled}{'-' * (BAR_WIDTH - filled)}] "
+        line += f"{fraction:4.0%} " if fraction is not None else "  -- "
+        line += f"{finished}/{count} 个工作簿"
+        if active:
+            progress = active[0]
+            done, total = progress.phase_counts()
+            rows = f"{done:,}/{total:,}" if total is not None else f"{done:,}"
+            line += f" | {progress.name} {PHASE_LABELS[progress.phase]} {rows} 行"
+        line += f" | {rate:,.0f} 行/秒 {byte_count / 1024 / 1024:.1f} MB ETA {_format_eta(eta)}"
+        with self.lock:
+            if self.line_open:
+                return
+            self.clear_bar()
+            self.stream.write(line)
+            self.stream.flush()
+            self.bar_width = _display_width(line)
+
+    def clear_bar(self):
+        """清除进度条所在行（调用方持有 lock）"""
+        if self.bar_width:
+            self.stream.write('\r' + ' ' * self.bar_width + '\r')
+            self.bar_width = 0
+
+    def _render_log(self):
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        with self.lock:
+            trackers = [progress for progress in self.trackers if progress.phase not in (PHASE_PENDING, PHASE_DONE)]
+        lines = []
+        for progress in trackers:
+            done, total = progress.phase_counts()
+            lines.append(
+                f"[进度] {timestamp} workbook={progress.name} phase={progress.phase} "
+                f"rows_fetched={progress.rows_fetched} rows_written={progress.rows_written} "
+                f"rows_formatted={progress.rows_formatted} "
+                f"total_rows={total if total is not None else '-'} rows_per_sec={progress.phase_rate():.0f} "
+                f"mb={progress.bytes_fetched / 1024 / 1024:.1f} eta={_format_eta(progress.phase_eta())}")
+        finished, count, fraction, rate, byte_count, eta = self.overall()
+        percent = f"{fraction:.0%}" if fraction is not None else '-'
+        lines.append(
+            f"[进度] {timestamp} workbook=* done={finished}/{count} percent={percent} "
+            f"rows_per_sec={rate:.0f} mb={byte_count / 1024 / 1024:.1f} eta={_format_eta(eta)}")
+        with self.lock:
+            for line in lines:
+                self.stream.write(line + '\n')
+            self.stream.flush()
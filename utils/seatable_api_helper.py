@@ -1,10 +1,38 @@
 from seatable_api import Base
+from seatable_api.utils import parse_response
 import os
+import json
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import requests
 from dotenv import load_dotenv
 
+# Optional fast JSON decoders, the stdlib json module is the fallback
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Load environment variables from .env file
 load_dotenv()
 
+# Status codes worth retrying: throttling and transient server errors
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BASE_DELAY = 0.5
+DEFAULT_MAX_DELAY = 30.0
+DEFAULT_PAGE_SIZE = 1000
+# SeaTable returns at most this many rows per list-rows request
+MAX_PAGE_SIZE = 1000
+DEFAULT_MAX_PARALLEL_PAGES = 8
+
 def get_seatable_config():
     """Load SeaTable configuration from environment variables."""
     return {
@@ -26,3 +54,285 @@ def fetch_data_from_seatable(base, table_name, view_name):
     if not rows:
         print(f"No data found for view '{view_name}'. Skipping...")
     return rows
+
+
+def decode_json(content):
+    """Decode a JSON response body with the fastest available decoder."""
+    if orjson is not None:
+        return orjson.loads(content)
+    if msgspec is not None:
+        return msgspec.json.decode(content)
+    return json.loads(content)
+
+def decode_rows(content):
+    """Decode a list-rows response body into row dicts."""
+    return decode_json(content).get('rows') or []
+
+def make_projected_rows_decoder(fields, defaults=None):
+    """Build a decoder that turns a list-rows response body straight into tuples.
+
+    Each row becomes a tuple of the given fields in order; every other key in
+    the payload is skipped. With msgspec the unused fields are never
+    materialised, otherwise rows are decoded to dicts and projected.
+    defaults maps field -> value for missing keys (default '').
+    """
+    defaults = defaults or {}
+    field_defaults = [defaults.get(field, '') for field in fields]
+
+    if msgspec is not None:
+        attr_names = [f"f{index}" for index in range(len(fields))]
+        row_type = msgspec.defstruct(
+            'ProjectedRow',
+            [(name, object, default) for name, default in zip(attr_names, field_defaults)],
+            rename=dict(zip(attr_names, fields)),
+        )
+        page_type = msgspec.defstruct('ProjectedPage', [('rows', list[row_type], [])])
+        decoder = msgspec.json.Decoder(page_type)
+        astuple = msgspec.structs.astuple
+
+        def decode_projected(content):
+            return [astuple(row) for row in decoder.decode(content).rows]
+
+        return decode_projected
+
+    pairs = list(zip(fields, field_defaults))
+
+    def decode_projected(content):
+        return [tuple([row.get(field, default) for field, default in pairs]) for row in decode_rows(content)]
+
+    return decode_projected
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limiter.
+
+    The limit grows by roughly one slot per window of successful requests and
+    is halved whenever the server pushes back (429 / 503).
+    """
+
+    def __init__(self, initial_limit=1, max_limit=DEFAULT_MAX_PARALLEL_PAGES, min_limit=1):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self._limit = float(max(min_limit, min(initial_limit, max_limit)))
+        self._in_flight = 0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self):
+        return int(self._limit)
+
+    def acquire(self):
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+
+    def release(self):
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+    def on_success(self):
+        with self._condition:
+            self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+            self._condition.notify_all()
+
+    def on_throttle(self):
+        with self._condition:
+            self._limit = max(self.min_limit, self._limit / 2)
+
+
+_server_limiters = {}
+_server_limiters_lock = threading.Lock()
+
+def get_server_limiter(server_url, max_limit=DEFAULT_MAX_PARALLEL_PAGES):
+    """Return the limiter shared by every request to the given server."""
+    with _server_limiters_lock:
+        if server_url not in _server_limiters:
+            _server_limiters[server_url] = AdaptiveLimiter(max_limit=max_limit)
+        return _server_limiters[server_url]
+
+
+def _backoff_delay(attempt, base_delay=DEFAULT_BASE_DELAY, max_delay=DEFAULT_MAX_DELAY):
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+def _retry_after_seconds(response):
+    """Parse the Retry-After header (seconds or HTTP date), None if absent."""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def request_with_retry(method, url, max_retries=DEFAULT_MAX_RETRIES, limiter=None, **kwargs):
+    """Send an HTTP request, retrying throttled / transient failures.
+
+    Honours Retry-After on 429/503, reports 2xx responses and throttling to the limiter.
+    Non-retryable responses are returned as-is so the caller can parse them.
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            response = requests.request(method, url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if attempt >= max_retries:
+                raise
+            delay = _backoff_delay(attempt)
+            print(f"Request to {url} failed ({type(e).__name__}), retrying in {delay:.1f}s...")
+            time.sleep(delay)
+            continue
+
+        if response.status_code not in RETRYABLE_STATUS_CODES:
+            # Only successful responses grow the limit; 4xx errors say nothing about capacity
+            if limiter is not None and 200 <= response.status_code < 300:
+                limiter.on_success()
+            return response
+
+        if limiter is not None and response.status_code in (429, 503):
+            limiter.on_throttle()
+        if attempt >= max_retries:
+            return response
+        delay = _retry_after_seconds(response)
+        if delay is None:
+            delay = _backoff_delay(attempt)
+        else:
+            delay += random.uniform(0, DEFAULT_BASE_DELAY)
+        print(f"Server returned {response.status_code}, retrying in {delay:.1f}s...")
+        time.sleep(delay)
+
+def call_with_retry(func, description, max_retries=DEFAULT_MAX_RETRIES):
+    """Call a seatable_api method, retrying throttled / transient failures.
+
+    Non-retryable errors, and retryable ones once max_retries is used up, are
+    raised to the caller.
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return func()
+        except ConnectionError as e:
+            # seatable_api raises ConnectionError(status_code, text)
+            status_code = e.args[0] if e.args else None
+            if status_code not in RETRYABLE_STATUS_CODES or attempt >= max_retries:
+                raise
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt >= max_retries:
+                raise
+        delay = _backoff_delay(attempt)
+        print(f"SeaTable {description} failed, retrying in {delay:.1f}s...")
+        time.sleep(delay)
+
+def auth_with_retry(base, max_retries=DEFAULT_MAX_RETRIES):
+    """Call base.auth(), retrying throttled / transient failures."""
+    call_with_retry(base.auth, 'auth', max_retries=max_retries)
+    return base
+
+def list_columns_with_retry(base, table_name, max_retries=DEFAULT_MAX_RETRIES):
+    """Call base.list_columns(), retrying throttled / transient failures."""
+    return call_with_retry(lambda: base.list_columns(table_name), f"list_columns for '{table_name}'",
+                           max_retries=max_retries)
+
+def _row_request(base, table_name, view_name):
+    """Build the list-rows URL and base query params for the base's endpoint."""
+    params = {'table_name': table_name}
+    if view_name:
+        params['view_name'] = view_name
+    if base.use_api_gateway:
+        params['convert_keys'] = True
+        return base.api_gateway._row_server_url(), params
+    return base._row_server_url(), params
+
+def list_rows_paged(base, table_name, view_name=None, page_size=DEFAULT_PAGE_SIZE,
+                    limiter=None, max_retries=DEFAULT_MAX_RETRIES, decode_page=decode_rows, on_page=None):
+    """Fetch all rows of a view page by page with parallel, adaptive page fetches.
+
+    Pages are requested speculatively up to the limiter's current limit until a
+    short page marks the end of the view. Rows are returned in view order.
+    page_size is clamped to MAX_PAGE_SIZE; if the first page still comes back
+    short but is not the end of the view, the server caps pages lower and its
+    page length is used from then on.
+    decode_page turns a response body into the page's rows (dicts by default,
+    see make_projected_rows_decoder for tuples). on_page, if given, is called as
+    on_page(row_count, byte_count) in the calling thread as each page arrives.
+    """
+    if limiter is None:
+        limiter = get_server_limiter(base.server_url)
+    url, base_params = _row_request(base, table_name, view_name)
+    if page_size > MAX_PAGE_SIZE:
+        print(f"Page size {page_size} exceeds the SeaTable limit of {MAX_PAGE_SIZE}, using {MAX_PAGE_SIZE}.")
+        page_size = MAX_PAGE_SIZE
+
+    def fetch_rows(start, limit):
+        params = dict(base_params, start=start, limit=limit)
+        with limiter:
+            response = request_with_retry('GET', url, max_retries=max_retries, limiter=limiter,
+                                          params=params, headers=base.headers, timeout=base.timeout)
+        if response.status_code >= 400:
+            parse_response(response)  # raises the same errors as seatable_api
+        return decode_page(response.content), len(response.content)
+
+    def fetch_page(page):
+        return fetch_rows(page * page_size, page_size)
+
+    # The first page is fetched alone: a short first page is either the whole
+    # view or a server-side cap, and a probe at its end tells the two apart.
+    first_rows, byte_count = fetch_page(0)
+    if on_page is not None:
+        on_page(len(first_rows), byte_count)
+    pages = {0: first_rows}
+    next_page = 1
+    last_page = None
+    if len(first_rows) < page_size:
+        last_page = 0
+        if first_rows:
+            probe_rows, byte_count = fetch_rows(len(first_rows), page_size)
+            if on_page is not None:
+                on_page(len(probe_rows), byte_count)
+            if probe_rows:
+                print(f"Warning: the server returned {len(first_rows)} rows for a page size of {page_size} "
+                      f"in '{table_name}', continuing with pages of {len(first_rows)} rows.")
+                page_size = len(first_rows)
+                pages[1] = probe_rows
+                next_page = 2
+                last_page = 1 if len(probe_rows) < page_size else None
+
+    in_flight = {}
+    with ThreadPoolExecutor(max_workers=limiter.max_limit) as executor:
+        while True:
+            while last_page is None and len(in_flight) < max(1, limiter.limit):
+                in_flight[executor.submit(fetch_page, next_page)] = next_page
+                next_page += 1
+            if not in_flight:
+                break
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                page = in_flight.pop(future)
+                try:
+                    rows, byte_count = future.result()
+                except Exception:
+                    for pending in in_flight:
+                        pending.cancel()
+                    raise
+                pages[page] = rows
+                if on_page is not None:
+                    on_page(len(rows), byte_count)
+                if len(rows) < page_size and (last_page is None or page < last_page):
+                    last_page = page
+
+    rows = []
+    for page in range(last_page + 1):
+        rows.extend(pages[page])
+    return rows